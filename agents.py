@@ -0,0 +1,48 @@
+# agents take the state of the table for the player to act and return an action such as "call" or "raise 20"
+
+def consoleAgent(state) -> str:
+	print("\n")
+	print(state["player"])
+	print(f"You are holding {str(state['hand'])[1:-1]}. The community cards are {str(state['community'])[1:-1]}")
+	print(f"You have currently bet £{state['bet']}")
+	possible = state["possible"]
+	if "Bet" in possible:
+		print(f"There is no bet right now. You may do one of the following: {str(possible)[1:-1]}")
+	elif "Check" in possible:
+		print(f"You are at the current bet of £{state['currentBet']}. You may do one of the following: {str(possible)[1:-1]}")
+	else:
+		print(f"You current bet is £{state['currentBet']}. You may do one of the following: {str(possible)[1:-1]}")
+	return input("Select an option: ").lower()
+
+def callingAgent(state) -> str:
+	if "Check" in state["possible"]:
+		return "check"
+	return "call"
+
+class RandomAgent:
+	def __init__(self, rng, aggression=0.2, foldRate=0.2):
+		self.rng = rng
+		self.aggression = aggression
+		self.foldRate = foldRate
+
+	def __call__(self, state) -> str:
+		possible = state["possible"]
+		roll = self.rng.random()
+
+		if roll < self.aggression:
+			if self.rng.random() < 0.1:
+				return "jam"
+			# bets and raises are at least a big blind more than the current bet
+			smallest = state["currentBet"] + state["big"]
+			if state["money"] + state["bet"] <= smallest:
+				return "jam"
+			amount = self.rng.randint(smallest, state["money"] + state["bet"])
+			if "Bet" in possible:
+				return f"bet {amount}"
+			return f"raise {amount}"
+
+		if "Fold" in possible and roll < self.aggression + self.foldRate:
+			return "fold"
+		if "Check" in possible:
+			return "check"
+		return "call"
@@ -0,0 +1,65 @@
+import multiprocessing
+import os
+import random
+from equity import EquityResult, checkCards, mergeTallies, sampleTallies, talliesToResults
+from evaluator import rankCodes
+
+def chunked(items, size) -> list[list]:
+	items = list(items)
+	return [items[i:i + size] for i in range(0, len(items), size)]
+
+def chunkSeed(seed, index) -> str:
+	# string seeds are hashed by random.Random so every chunk gets its own stream for a given seed
+	return f"{seed}:{index}"
+
+def runChunks(worker, jobs, workers=None):
+	# results come back in job order while later jobs are still running
+	workers = workers if workers else os.cpu_count()
+	if workers == 1 or len(jobs) <= 1:
+		for job in jobs:
+			yield worker(job)
+		return
+
+	with multiprocessing.Pool(min(workers, len(jobs))) as pool:
+		for result in pool.imap(worker, jobs):
+			yield result
+
+def mapChunk(job) -> list:
+	func, items = job
+	return [func(x) for x in items]
+
+def batchMap(func, items, workers=None, chunkSize=1000):
+	# func must be a module level function so it can be sent to the workers
+	for results in runChunks(mapChunk, [(func, x) for x in chunked(items, chunkSize)], workers):
+		for result in results:
+			yield result
+
+def equityChunk(job) -> list[list]:
+	holeCodes, boardCodes, deadCodes, trials, seed = job
+	return sampleTallies(holeCodes, boardCodes, deadCodes, trials, random.Random(seed))
+
+def batchEquity(hands, board=[], dead=[], trials=1000000, workers=None, chunkSize=50000, seed=None) -> list[EquityResult]:
+	holeCodes, boardCodes, deadCodes = checkCards(hands, board, dead)
+	if seed is None:
+		seed = random.getrandbits(64)
+
+	# the same seed and chunk size give the same result whatever the number of workers
+	jobs = []
+	for i, start in enumerate(range(0, trials, chunkSize)):
+		jobs.append((holeCodes, boardCodes, deadCodes, min(chunkSize, trials - start), chunkSeed(seed, i)))
+
+	tallies = None
+	for result in runChunks(equityChunk, jobs, workers):
+		tallies = mergeTallies(tallies, result) if tallies else result
+	return talliesToResults(tallies, trials)
+
+def showdownWinners(deal) -> list[int]:
+	holeCodes, boardCodes = deal
+	ranks = [rankCodes(x + boardCodes) for x in holeCodes]
+	best = max(ranks)
+	return [i for i, x in enumerate(ranks) if x == best]
+
+def batchShowdowns(deals, workers=None, chunkSize=1000):
+	# deals are (hands, board) pairs, yields the indexes of the winning hands for each deal
+	codes = [([[x.code for x in hand] for hand in hands], [x.code for x in board]) for hands, board in deals]
+	return batchMap(showdownWinners, codes, workers, chunkSize)
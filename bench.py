@@ -0,0 +1,202 @@
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+from agents import RandomAgent
+from cards import Deck
+from evaluator import HandTracker
+from v2 import HoldEm
+
+# every benchmark builds its inputs from the seed and returns a function that runs one batch and the number of operations in it
+BASELINE = "bench.json"
+names = ["Alice", "Bob", "Charlie", "David", "Eve", "Frank", "Grace", "Heidi", "Ivan"]
+
+def dealtHands(seed, count, cards=7) -> list[list]:
+	deck = Deck(seed)
+	hands = []
+	for _ in range(count):
+		deck.shuffle()
+		hands.append(deck.deal(cards))
+	return hands
+
+def benchShuffle(seed, size):
+	deck = Deck(seed)
+	def run():
+		for i in range(size):
+			deck.shuffle(i)
+		return size
+	return run
+
+def benchDeal(seed, size):
+	# the cards for a nine handed hand, hole cards then the board
+	deck = Deck(seed)
+	def run():
+		for _ in range(size):
+			deck.shuffle()
+			for _ in range(9):
+				deck.deal(2)
+			deck.deal(3)
+			deck.deal(1)
+			deck.deal(1)
+		return size
+	return run
+
+def benchCheck(method):
+	def bench(seed, size):
+		game = HoldEm(1, 2, 100, [])
+		check = getattr(game, method)
+		hands = dealtHands(seed, size)
+		def run():
+			for hand in hands:
+				check(list(hand))
+			return size
+		return run
+	return bench
+
+def benchWinners(seed, size):
+	# showdowns between six players on a full board, each hand tracked street by street the way the engine scores it
+	game = HoldEm(1, 2, 100, names[:6], seed=seed)
+	players = game.seats.createList()
+	spots = dealtHands(seed, size, 17)
+	def run():
+		for cards in spots:
+			strength = {x: HandTracker(cards[2 * i:2 * i + 2]) for i, x in enumerate(players)}
+			for street in [cards[12:15], cards[15:16], cards[16:17]]:
+				for tracker in strength.values():
+					tracker.add(street)
+			game.findWinners(players, {x: strength[x].rank for x in players})
+		return size
+	return run
+
+def benchSidePots(seed, size):
+	# six players all in for different stacks, the pots are rebuilt after every bet
+	rng = random.Random(seed)
+	game = HoldEm(1, 2, 100, names[:6], seed=seed)
+	players = game.seats.createList()
+	stacks = [[rng.randint(10, 1000) for _ in players] for _ in range(size)]
+	def run():
+		for row in stacks:
+			game.contributions = {}
+			game.bets = {}
+			game.bet = 0
+			for player, stack in zip(players, row):
+				player.money = stack
+				player.state = 2
+			for player in players:
+				game.handleBet(player, player.money)
+				game.handleSidePot()
+		return size
+	return run
+
+def benchHands(seats):
+	def bench(seed, size):
+		# random agents that refill their stacks whenever the table can no longer play
+		rng = random.Random(seed)
+		game = HoldEm(1, 2, 200, names[:seats], rng=rng)
+		for name in names[:seats]:
+			game.agents[name] = RandomAgent(rng)
+		def run():
+			for _ in range(size):
+				if not game.canPlay():
+					for player in game.seats.createList():
+						player.money = 200
+				game.playHand()
+			return size
+		return run
+	return bench
+
+# name: (benchmark, operations per batch)
+benchmarks = {
+	"deck.shuffle": (benchShuffle, 10000),
+	"deck.deal": (benchDeal, 2000),
+	"flushCheck": (benchCheck("flushCheck"), 2000),
+	"straightCheck": (benchCheck("straightCheck"), 2000),
+	"straightFlushCheck": (benchCheck("straightFlushCheck"), 2000),
+	"royalFlushCheck": (benchCheck("royalFlushCheck"), 2000),
+	"multiplesCheck": (benchCheck("multiplesCheck"), 2000),
+	"findWinners": (benchWinners, 2000),
+	"handleBet.sidePots": (benchSidePots, 1000),
+	"hands.2": (benchHands(2), 200),
+	"hands.6": (benchHands(6), 100),
+	"hands.9": (benchHands(9), 100),
+}
+
+def measure(bench, size, seed=0, repeat=5) -> dict:
+	# the fastest of the repeats is the least disturbed by everything else on the machine
+	times = []
+	for _ in range(repeat):
+		run = bench(seed, size)
+		start = time.perf_counter()
+		operations = run()
+		times.append((time.perf_counter() - start) / operations)
+	best = min(times)
+	return {"opsPerSec": 1 / best, "usPerOp": best * 1e6, "operations": operations, "repeat": repeat}
+
+def runBenchmarks(only=None, seed=0, repeat=5, scale=1.0) -> dict:
+	results = {}
+	for name, (bench, size) in benchmarks.items():
+		if only and not any(x in name for x in only):
+			continue
+		results[name] = measure(bench, max(1, int(size * scale)), seed, repeat)
+	return {
+		"python": platform.python_version(),
+		"implementation": platform.python_implementation(),
+		"machine": platform.machine(),
+		"seed": seed,
+		"results": results,
+	}
+
+def compare(results, baseline, tolerance=0.1) -> list[tuple]:
+	# (name, baseline ops/sec, new ops/sec) for every benchmark more than tolerance slower than the baseline
+	slower = []
+	for name, result in results["results"].items():
+		if name not in baseline["results"]:
+			continue
+		old = baseline["results"][name]["opsPerSec"]
+		if result["opsPerSec"] < old * (1 - tolerance):
+			slower.append((name, old, result["opsPerSec"]))
+	return slower
+
+def report(results, baseline=None):
+	for name, result in results["results"].items():
+		line = f"{name:<20} {result['opsPerSec']:>12,.0f} ops/s {result['usPerOp']:>10.2f} us/op"
+		if baseline and name in baseline["results"]:
+			line += f" {result['opsPerSec'] / baseline['results'][name]['opsPerSec'] - 1:>+8.1%}"
+		print(line)
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(description="Benchmark the deck, hand checks, betting engine and full hands")
+	parser.add_argument("--only", nargs="*", help="Run the benchmarks whose names contain any of these")
+	parser.add_argument("--seed", type=int, default=0)
+	parser.add_argument("--repeat", type=int, default=5)
+	parser.add_argument("--scale", type=float, default=1.0, help="Multiply the operations in every batch")
+	parser.add_argument("--output", help="Write the results as JSON")
+	parser.add_argument("--baseline", default=BASELINE, help="Results to compare against")
+	parser.add_argument("--save", action="store_true", help="Save the results as the new baseline")
+	parser.add_argument("--tolerance", type=float, default=0.1, help="Fraction slower than the baseline that counts as a regression")
+	args = parser.parse_args()
+
+	results = runBenchmarks(args.only, args.seed, args.repeat, args.scale)
+	baseline = None
+	if not args.save:
+		try:
+			with open(args.baseline) as f:
+				baseline = json.load(f)
+		except FileNotFoundError:
+			print(f"No baseline at {args.baseline}, save one with --save")
+	report(results, baseline)
+
+	if args.output:
+		with open(args.output, "w") as f:
+			json.dump(results, f, indent=2)
+	if args.save:
+		with open(args.baseline, "w") as f:
+			json.dump(results, f, indent=2)
+	elif baseline:
+		slower = compare(results, baseline, args.tolerance)
+		for name, old, new in slower:
+			print(f"Regression: {name} {old:,.0f} -> {new:,.0f} ops/s")
+		if slower:
+			sys.exit(1)
@@ -0,0 +1,152 @@
+import argparse
+import itertools
+import mmap
+import os
+import random
+import struct
+from batch import chunked, runChunks
+from canonical import canonicalIndex, fromIndex, handIndexer
+from evaluator import CARD_BITS, CARD_PRIMES, handState, rankState
+
+# expected hand strength against a random hand for every canonical (hole cards, board) on a street
+# the table is two bytes per situation at its canonical index, EHS then EHS squared, each stored as 1 + 254 times the value so 0 marks a situation that was not built
+HEADER = struct.Struct("<4sBQQI")
+MAGIC = b"BKv2"
+SLOT = 2
+STREETS = {3: "flop", 4: "turn", 5: "river"}
+paths = {x: os.path.join(os.path.dirname(os.path.abspath(__file__)), f"buckets-{y}.bin") for x, y in STREETS.items()}
+
+def canonicalBoards(cards) -> list[list[int]]:
+	# one board for every set of boards that only differ by suits
+	return [fromIndex(x, (cards,))[0] for x in range(len(handIndexer((cards,))))]
+
+def strength(hole, board, trials, rng) -> tuple[float, float]:
+	# EHS over sampled opponent hands and runouts, and the mean of its square over the runouts as a measure of how much it can still move
+	used = set(hole) | set(board)
+	cards = [x for x in range(52) if x not in used]
+	missing = 5 - len(board)
+	boardBits, boardKey = handState(board)
+	holeBits, holeKey = handState(hole)
+	runouts = max(1, trials // 10) if missing else 1
+	total = 0.0
+	squares = 0.0
+	opponents = max(1, trials // runouts)
+	for _ in range(runouts):
+		bits, key = boardBits, boardKey
+		drawn = rng.sample(cards, missing)
+		for code in drawn:
+			bits |= CARD_BITS[code]
+			key *= CARD_PRIMES[code]
+		mine = rankState(bits | holeBits, key * holeKey)
+		rest = [x for x in cards if x not in drawn]
+		shares = 0.0
+		for _ in range(opponents):
+			a, b = rng.sample(rest, 2)
+			theirs = rankState(bits | CARD_BITS[a] | CARD_BITS[b], key * CARD_PRIMES[a] * CARD_PRIMES[b])
+			shares += 1.0 if mine > theirs else 0.5 if mine == theirs else 0.0
+		share = shares / opponents
+		total += share
+		squares += share * share
+	return total / runouts, squares / runouts
+
+def strengthChunk(job) -> list[tuple[int, int, int]]:
+	# (index, EHS byte, EHS squared byte) for every canonical situation on these boards
+	boards, trials, seed = job
+	rng = random.Random(seed)
+	indexer = handIndexer((2, len(boards[0])))
+	results = []
+	for board in boards:
+		seen = set()
+		cards = [x for x in range(52) if x not in board]
+		for hole in itertools.combinations(cards, 2):
+			index = indexer.index([hole, board])
+			if index in seen:
+				continue
+			seen.add(index)
+			ehs, ehs2 = strength(list(hole), board, trials, rng)
+			results.append((index, 1 + round(ehs * 254), 1 + round(ehs2 * 254)))
+	return results
+
+def build(cards=3, trials=200, workers=None, path=None, seed=0, limit=None, chunkSize=20):
+	# limit builds only the first canonical boards, for trying the job out, lookups for the rest come back as None
+	path = path if path else paths[cards]
+	boards = canonicalBoards(cards)[:limit]
+	jobs = [(x, trials, f"{seed}:{i}") for i, x in enumerate(chunked(boards, chunkSize))]
+	size = len(handIndexer((2, cards)))
+	# the file is made full size up front and mapped, so results go straight to their slots and are never all held in memory
+	with open(path, "wb") as f:
+		f.truncate(HEADER.size + size * SLOT)
+	count = 0
+	with open(path, "r+b") as f:
+		table = mmap.mmap(f.fileno(), 0)
+		for results in runChunks(strengthChunk, jobs, workers):
+			for index, ehs, ehs2 in results:
+				offset = HEADER.size + index * SLOT
+				count += not table[offset]
+				table[offset] = ehs
+				table[offset + 1] = ehs2
+		HEADER.pack_into(table, 0, MAGIC, cards, size, count, trials)
+		table.flush()
+		table.close()
+	return count
+
+class BucketTable:
+	def __init__(self, path):
+		self.path = path
+		self.file = open(path, "rb")
+		self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+		magic, self.cards, self.size, self.count, self.trials = HEADER.unpack_from(self.map)
+		if magic != MAGIC:
+			raise ValueError(f"{path} is not a bucket table")
+
+	def __repr__(self):
+		return f"Bucket table {STREETS[self.cards]}: {self.count} of {self.size} situations"
+
+	def __len__(self):
+		return self.count
+
+	def close(self):
+		self.map.close()
+		self.file.close()
+
+	def lookup(self, index) -> tuple[float, float]:
+		# EHS and EHS squared at a canonical index, None for a situation the table was not built with
+		offset = HEADER.size + index * SLOT
+		ehs = self.map[offset]
+		if not ehs:
+			return None
+		return (ehs - 1) / 254, (self.map[offset + 1] - 1) / 254
+
+tables = {}
+
+def loadTable(cards) -> BucketTable:
+	if cards not in tables:
+		if not os.path.exists(paths[cards]):
+			raise FileNotFoundError(f"{paths[cards]} is missing, build it with: python buckets.py --street {STREETS[cards]}")
+		tables[cards] = BucketTable(paths[cards])
+	return tables[cards]
+
+def handStrength(hole, board, trials=200) -> tuple[float, float]:
+	# hole and board as Cards, read from the street's table and worked out live for anything it does not hold
+	holeCodes = [x.code for x in hole]
+	boardCodes = [x.code for x in board]
+	index = canonicalIndex([holeCodes, boardCodes])
+	found = loadTable(len(boardCodes)).lookup(index)
+	if found is None:
+		return strength(holeCodes, boardCodes, trials, random.Random(index))
+	return found
+
+def bucket(hole, board, buckets=10) -> int:
+	# equal width EHS buckets
+	return min(int(handStrength(hole, board)[0] * buckets), buckets - 1)
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(description="Build the hand strength bucket tables")
+	parser.add_argument("--street", choices=list(STREETS.values()), default="flop")
+	parser.add_argument("--trials", type=int, default=200)
+	parser.add_argument("--workers", type=int, default=None)
+	parser.add_argument("--seed", type=int, default=0)
+	parser.add_argument("--limit", type=int, default=None, help="Only build the first canonical boards")
+	args = parser.parse_args()
+	cards = {y: x for x, y in STREETS.items()}[args.street]
+	print(f"{build(cards, args.trials, args.workers, seed=args.seed, limit=args.limit)} situations")
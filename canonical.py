@@ -0,0 +1,201 @@
+from bisect import bisect_right
+from math import comb
+
+# groups of card codes (say each player's hole cards then the board) are the same spot under any relabelling of the suits
+# each suit's signature is its 13-bit value mask in every group, sorting the signatures picks one labelling for all of them
+
+def suitSignatures(groups) -> list[tuple]:
+	masks = [[0] * len(groups) for _ in range(4)]
+	for g, codes in enumerate(groups):
+		for code in codes:
+			masks[code & 3][g] |= 1 << (code >> 2)
+	return [tuple(x) for x in masks]
+
+def canonicalize(groups) -> tuple[int, list[int]]:
+	# the canonical key and the new suit for each old suit
+	signatures = suitSignatures(groups)
+	order = sorted(range(4), key=lambda x: signatures[x], reverse=True)
+	key = 0
+	for suit in order:
+		for mask in signatures[suit]:
+			key = key << 13 | mask
+	mapping = [0] * 4
+	for new, old in enumerate(order):
+		mapping[old] = new
+	return key, mapping
+
+def canonicalKey(groups) -> int:
+	key = 0
+	for signature in sorted(suitSignatures(groups), reverse=True):
+		for mask in signature:
+			key = key << 13 | mask
+	return key
+
+def fromKey(key, groups) -> list[list[int]]:
+	# the canonical card codes of every group, the first signature is suit 0
+	codes = [[] for _ in range(groups)]
+	for suit in range(3, -1, -1):
+		for g in range(groups - 1, -1, -1):
+			mask = key & 0x1FFF
+			key >>= 13
+			codes[g] += [value * 4 + suit for value in range(13) if mask >> value & 1]
+	return [sorted(x) for x in codes]
+
+def canonicalGroups(groups) -> list[list[int]]:
+	return fromKey(canonicalKey(groups), len(groups))
+
+def situationKey(hole, board) -> int:
+	# hole cards and board as Cards, the key used for caches and precomputed tables
+	return canonicalKey([[x.code for x in hole], [x.code for x in board]])
+
+# dense indexes, every canonical situation for given group sizes gets one of the numbers 0 to size - 1
+# each suit's ranks are numbered group by group among the ranks it has not used yet, suits with the same card counts
+# in every group can be swapped so they are numbered together as a multiset, and the offsets of each way of splitting
+# the counts over the suits put the pieces into one range
+
+def subsetFromIndex(index, count) -> list[int]:
+	# the sorted positions with this colex number
+	positions = []
+	for size in range(count, 0, -1):
+		x = size - 1
+		while comb(x + 1, size) <= index:
+			x += 1
+		index -= comb(x, size)
+		positions.append(x)
+	return positions[::-1]
+
+class HandIndexer:
+	def __init__(self, sizes):
+		self.sizes = tuple(sizes)
+		# every way of giving each suit a count in every group, with the suits in descending order of their counts
+		self.configs = []
+		self.offsets = []
+		self.size = 0
+		for config in self.splits(0, [[] for _ in range(4)]):
+			self.configs.append(config)
+			self.offsets.append(self.size)
+			self.size += self.configSize(config)
+		self.configIndex = {x: i for i, x in enumerate(self.configs)}
+		# for every config, each distinct set of counts with how many suits have it and how many multisets of them there are
+		self.layouts = {}
+		for config in self.configs:
+			self.layouts[config] = [(x, config.count(x), comb(self.suitSize(x) + config.count(x) - 1, config.count(x))) for x in sorted(set(config), reverse=True)]
+
+	def __repr__(self):
+		return f"Hand indexer {list(self.sizes)}: {self.size} situations"
+
+	def __len__(self):
+		return self.size
+
+	def splits(self, group, counts):
+		if group == len(self.sizes):
+			config = tuple(tuple(x) for x in counts)
+			if all(config[i] >= config[i + 1] for i in range(3)):
+				yield config
+			return
+		for split in self.groupSplits(self.sizes[group], 4, counts):
+			yield from self.splits(group + 1, [x + [y] for x, y in zip(counts, split)])
+
+	def groupSplits(self, cards, suits, counts):
+		if suits == 1:
+			if sum(counts[-1]) + cards <= 13:
+				yield [cards]
+			return
+		used = sum(counts[4 - suits])
+		for x in range(min(cards, 13 - used) + 1):
+			for rest in self.groupSplits(cards - x, suits - 1, counts):
+				yield [x] + rest
+
+	def suitSize(self, counts) -> int:
+		size = 1
+		left = 13
+		for x in counts:
+			size *= comb(left, x)
+			left -= x
+		return size
+
+	def configSize(self, config) -> int:
+		size = 1
+		for counts in set(config):
+			size *= comb(self.suitSize(counts) + config.count(counts) - 1, config.count(counts))
+		return size
+
+	def suitIndex(self, masks) -> int:
+		index = 0
+		radix = 1
+		used = 0
+		left = 13
+		for mask in masks:
+			# each rank's position among the ranks this suit has not used yet, found from the bits below it
+			subset = 0
+			count = 0
+			rest = mask
+			while rest:
+				low = rest & -rest
+				count += 1
+				subset += comb(low.bit_length() - 1 - (used & (low - 1)).bit_count(), count)
+				rest ^= low
+			index += radix * subset
+			radix *= comb(left, count)
+			left -= count
+			used |= mask
+		return index
+
+	def suitMasks(self, index, counts) -> list[int]:
+		masks = []
+		used = 0
+		for count in counts:
+			left = [x for x in range(13) if not used >> x & 1]
+			digits = comb(len(left), count)
+			mask = 0
+			for position in subsetFromIndex(index % digits, count):
+				mask |= 1 << left[position]
+			index //= digits
+			masks.append(mask)
+			used |= mask
+		return masks
+
+	def index(self, groups) -> int:
+		signatures = suitSignatures(groups)
+		suits = sorted(((tuple(x.bit_count() for x in y), self.suitIndex(y)) for y in signatures), reverse=True)
+		config = tuple(x for x, _ in suits)
+		index = 0
+		for counts, k, digits in self.layouts[config]:
+			# the suits with these counts, largest index first, as a multiset
+			values = [y for x, y in suits if x == counts]
+			index = index * digits + sum(comb(x + k - 1 - i, k - i) for i, x in enumerate(values))
+		return self.offsets[self.configIndex[config]] + index
+
+	def groups(self, index) -> list[list[int]]:
+		# the canonical card codes of every group, suits numbered in the order the indexer sorts them
+		i = bisect_right(self.offsets, index) - 1
+		config = self.configs[i]
+		index -= self.offsets[i]
+		suitMasks = []
+		for counts, k, digits in self.layouts[config][::-1]:
+			rest = index % digits
+			index //= digits
+			values = [x - (k - 1 - j) for j, x in enumerate(subsetFromIndex(rest, k)[::-1])]
+			suitMasks = [self.suitMasks(x, counts) for x in values] + suitMasks
+		codes = [[] for _ in self.sizes]
+		for suit, masks in enumerate(suitMasks):
+			for g, mask in enumerate(masks):
+				codes[g] += [value * 4 + suit for value in range(13) if mask >> value & 1]
+		return [sorted(x) for x in codes]
+
+indexers = {}
+
+def handIndexer(sizes) -> HandIndexer:
+	sizes = tuple(sizes)
+	if sizes not in indexers:
+		indexers[sizes] = HandIndexer(sizes)
+	return indexers[sizes]
+
+def canonicalIndex(groups) -> int:
+	return handIndexer(len(x) for x in groups).index(groups)
+
+def fromIndex(index, sizes) -> list[list[int]]:
+	return handIndexer(sizes).groups(index)
+
+def situationIndex(hole, board) -> int:
+	return canonicalIndex([[x.code for x in hole], [x.code for x in board]])
@@ -0,0 +1,70 @@
+import random
+
+mapSuits = {0: 'Hearts', 1: 'Diamonds', 2: 'Spades', 3: 'Clubs'}
+mapVals = {x: str(x + 2) for x in range(9)} | {9: 'Jack', 10: 'Queen', 11: 'King', 12: 'Ace'}
+shortSuits = "hdsc"
+shortVals = "23456789TJQKA"
+
+# cards are interned, code is value * 4 + suit so Card(suit, value) always returns the same object
+class Card:
+	__slots__ = ("code", "suit", "value")
+
+	def __new__(cls, suit, value):
+		return CARDS[value * 4 + suit]
+
+	def __repr__(self):
+		return f"{mapVals[self.value]} of {mapSuits[self.suit]}"
+
+	def __reduce__(self):
+		return (Card, (self.suit, self.value))
+
+def makeCard(code) -> Card:
+	card = object.__new__(Card)
+	card.code = code
+	card.suit = code & 3
+	card.value = code >> 2
+	return card
+
+CARDS = [makeCard(x) for x in range(52)]
+
+# parse short names such as "As Kd" or "AsKd"
+def parseCards(text) -> list[Card]:
+	text = text.replace(" ", "").replace(",", "")
+	if len(text) % 2:
+		raise ValueError(f"Invalid cards {text}")
+	cards = []
+	for i in range(0, len(text), 2):
+		value = shortVals.find(text[i].upper())
+		suit = shortSuits.find(text[i + 1].lower())
+		if value < 0 or suit < 0:
+			raise ValueError(f"Invalid card {text[i:i + 2]}")
+		cards.append(Card(suit, value))
+	return cards
+
+def shortName(card) -> str:
+	return shortVals[card.value] + shortSuits[card.suit]
+
+# the deck is only shuffled as it is dealt, each deal swaps a random undealt card to the cursor
+class Deck:
+	def __init__(self, seed=None, rng=None):
+		self.cards = list(CARDS)
+		self.dealt = 0
+		self.rng = rng if rng else random.Random(seed)
+	
+	def __repr__(self):
+		return str(self.cards[self.dealt:])[1:-1]
+	
+	def shuffle(self, seed=None):
+		self.dealt = 0
+		if seed is not None:
+			self.cards[:] = CARDS
+			self.rng.seed(seed)
+	
+	def deal(self, number=1):
+		cards = self.cards
+		start = self.dealt
+		for i in range(start, start + number):
+			j = self.rng.randrange(i, 52)
+			cards[i], cards[j] = cards[j], cards[i]
+		self.dealt += number
+		return cards[start:self.dealt]
@@ -0,0 +1,269 @@
+import argparse
+import os
+import numpy as np
+from batch import batchMap
+from gamestate import GameState, applyAction, legalActions, placeBet
+from preflop import CLASSES, classCombos, className, headsUp, matchupEquity, paths
+
+# heads up preflop games on the engine's own rules, seat 0 is the button and small blind
+# cards are abstracted to buckets of the 169 starting hands, a bet that ends the action goes to showdown for its equity
+class Node:
+	def __init__(self, state: GameState, history):
+		self.state = state
+		self.history = history
+		# a fold ends the hand even though the engine would still let the other player check
+		self.player = state.toAct if 0 not in state.states else -1
+		self.actions = []
+		self.children = []
+		# decision nodes own a block of actions * buckets in the flat regret and strategy arrays
+		self.offset = 0
+
+	def __repr__(self):
+		return f"Node {' '.join(self.history) or 'root'}: {'terminal' if self.terminal() else self.actions}"
+
+	def terminal(self) -> bool:
+		return self.player < 0
+
+def abstractActions(state: GameState, raiseSizes, maxRaises, raises, limp) -> list[str]:
+	# the engine's possible actions with bets and raises limited to multiples of the current bet
+	actions = []
+	seat = state.toAct
+	for possible in legalActions(state):
+		if possible == "Fold":
+			actions.append("fold")
+		elif possible == "Check":
+			actions.append("check")
+		elif possible == "Call":
+			if limp or state.bet > state.big or seat != state.button:
+				actions.append("call")
+		elif possible == "Jam":
+			actions.append("jam")
+		elif raises < maxRaises:
+			for size in raiseSizes:
+				total = int(state.bet * size)
+				if state.bet < total < state.stacks[seat] + state.bets[seat]:
+					actions.append(f"{possible.lower()} {total}")
+	return actions
+
+def buildTree(stack, small, big, raiseSizes=[], maxRaises=1, limp=True) -> Node:
+	state = GameState(0, big, (stack, stack), (0, 0), (0, 0), (2, 2), ((), ()), (), 0, 0, -1)
+	state = placeBet(placeBet(state, 0, small), 1, big)
+	# preflop action starts after the big blind, which heads up is the button
+	state = state.replace(pending=0b10, toAct=0)
+
+	def grow(node, raises):
+		if node.terminal():
+			return
+		node.actions = abstractActions(node.state, raiseSizes, maxRaises, raises, limp)
+		for action in node.actions:
+			child = Node(applyAction(node.state, action), node.history + [action])
+			node.children.append(child)
+			grow(child, raises + (action.startswith("raise") or action.startswith("bet")))
+
+	root = Node(state, [])
+	grow(root, 0)
+	return root
+
+def decisionNodes(root) -> list[Node]:
+	nodes = []
+	stack = [root]
+	while stack:
+		node = stack.pop()
+		if not node.terminal():
+			nodes.append(node)
+			stack += reversed(node.children)
+	return nodes
+
+def comboMasks(index) -> list[int]:
+	return [(1 << a) | (1 << b) for a, b in classCombos(index)]
+
+def classWeights() -> np.ndarray:
+	# chance of each pair of starting hands being dealt heads up, counting the combos that do not share a card
+	masks = [comboMasks(x) for x in range(CLASSES)]
+	weights = np.zeros((CLASSES, CLASSES))
+	for a in range(CLASSES):
+		for b in range(a, CLASSES):
+			count = sum(1 for x in masks[a] for y in masks[b] if not x & y)
+			weights[a, b] = weights[b, a] = count
+	return weights / weights.sum()
+
+def classEquities(trials=2000, workers=None, seed=0) -> np.ndarray:
+	# equity of the row class against the column class, read from the preflop table when it has been built
+	equities = np.zeros((CLASSES, CLASSES))
+	if os.path.exists(paths[2]):
+		for a in range(CLASSES):
+			for b in range(CLASSES):
+				equities[a, b] = headsUp(a, b)
+		return equities
+	jobs = [((a, b), trials, f"{seed}:{a}:{b}") for a in range(CLASSES) for b in range(a, CLASSES)]
+	for ((a, b), _, _), result in zip(jobs, batchMap(matchupEquity, jobs, workers, 100)):
+		equities[a, b] = result[0]
+		equities[b, a] = result[1]
+	return equities
+
+def bucketClasses(weights, equities, buckets) -> list[int]:
+	# classes sorted by equity against a random hand and cut into buckets of equal probability
+	if buckets >= CLASSES:
+		return list(range(CLASSES))
+	strength = (weights * equities).sum(axis=1) / weights.sum(axis=1)
+	probability = weights.sum(axis=1)
+	bucket = [0] * CLASSES
+	seen = 0.0
+	for x in np.argsort(strength):
+		bucket[x] = min(int(seen * buckets), buckets - 1)
+		seen += probability[x]
+	return bucket
+
+class Abstraction:
+	def __init__(self, weights, equities, buckets=CLASSES):
+		self.classes = bucketClasses(weights, equities, buckets)
+		self.buckets = max(self.classes) + 1
+		# the class matrices summed into buckets, equity becomes the weighted average
+		grouping = np.zeros((CLASSES, self.buckets))
+		grouping[np.arange(CLASSES), self.classes] = 1
+		self.weights = grouping.T @ weights @ grouping
+		totals = grouping.T @ (weights * equities) @ grouping
+		self.equities = totals / np.where(self.weights > 0, self.weights, 1)
+
+	def __repr__(self):
+		return f"Abstraction: {self.buckets} buckets"
+
+class Solver:
+	def __init__(self, root: Node, abstraction: Abstraction, plus=True):
+		self.root = root
+		self.abstraction = abstraction
+		self.plus = plus
+		self.iterations = 0
+		self.nodes = decisionNodes(root)
+		size = 0
+		for node in self.nodes:
+			node.offset = size
+			size += len(node.actions) * abstraction.buckets
+		# one flat block for every decision node's regrets and strategy sums
+		self.regrets = np.zeros(size)
+		self.strategySums = np.zeros(size)
+		# showdown and fold values per pair of buckets from each seat's side, before scaling by the chips at stake
+		w = abstraction.weights
+		self.showdown = [w * (2 * abstraction.equities - 1), w.T * (1 - 2 * abstraction.equities.T)]
+		self.chances = [w, w.T]
+
+	def __repr__(self):
+		return f"Solver: {len(self.nodes)} decision nodes: {self.iterations} iterations"
+
+	def block(self, array, node) -> np.ndarray:
+		return array[node.offset:node.offset + len(node.actions) * self.abstraction.buckets].reshape(len(node.actions), -1)
+
+	def strategy(self, node) -> np.ndarray:
+		# regret matching, buckets with no positive regret play evenly
+		positive = np.maximum(self.block(self.regrets, node), 0)
+		totals = positive.sum(axis=0)
+		return np.where(totals > 0, positive / np.where(totals > 0, totals, 1), 1 / len(node.actions))
+
+	def averageStrategy(self, node) -> np.ndarray:
+		sums = self.block(self.strategySums, node)
+		totals = sums.sum(axis=0)
+		return np.where(totals > 0, sums / np.where(totals > 0, totals, 1), 1 / len(node.actions))
+
+	def terminalValues(self, node, player, reach) -> np.ndarray:
+		# chips won by each of the player's buckets against the opponent's reach
+		state = node.state
+		other = 1 - player
+		if state.states[player] == 0:
+			return -state.contributions[player] * (self.chances[player] @ reach)
+		if state.states[other] == 0:
+			return state.contributions[other] * (self.chances[player] @ reach)
+		matched = min(state.contributions)
+		return matched * (self.showdown[player] @ reach)
+
+	def walk(self, node, player, reach, ownReach, weight) -> np.ndarray:
+		if node.terminal():
+			return self.terminalValues(node, player, reach)
+		strategy = self.strategy(node)
+		if node.player != player:
+			values = 0
+			for i, child in enumerate(node.children):
+				values = values + self.walk(child, player, reach * strategy[i], ownReach, weight)
+			return values
+
+		childValues = np.array([self.walk(child, player, reach, ownReach * strategy[i], weight) for i, child in enumerate(node.children)])
+		values = (strategy * childValues).sum(axis=0)
+		regrets = self.block(self.regrets, node)
+		regrets += childValues - values
+		if self.plus:
+			np.maximum(regrets, 0, out=regrets)
+		self.block(self.strategySums, node)[:] += weight * ownReach * strategy
+		return values
+
+	def iterate(self, iterations):
+		# alternating updates, cfr+ weights later strategies more in the average
+		ones = np.ones(self.abstraction.buckets)
+		for _ in range(iterations):
+			self.iterations += 1
+			weight = self.iterations if self.plus else 1
+			for player in range(2):
+				self.walk(self.root, player, ones, ones, weight)
+
+	def bestResponse(self, node, player, reach) -> np.ndarray:
+		if node.terminal():
+			return self.terminalValues(node, player, reach)
+		strategy = self.averageStrategy(node)
+		if node.player != player:
+			values = 0
+			for i, child in enumerate(node.children):
+				values = values + self.bestResponse(child, player, reach * strategy[i])
+			return values
+		return np.max([self.bestResponse(child, player, reach) for child in node.children], axis=0)
+
+	def exploitability(self) -> float:
+		# chips per hand a best response wins on average over both seats, 0 at an equilibrium
+		ones = np.ones(self.abstraction.buckets)
+		return float(sum(self.bestResponse(self.root, x, ones).sum() for x in range(2)) / 2)
+
+	def chart(self, node=None) -> dict[str: dict[str: float]]:
+		# class name: action: probability, for the node's player
+		node = node if node else self.root
+		strategy = self.averageStrategy(node)
+		return {className(x): {a: float(strategy[i, self.abstraction.classes[x]]) for i, a in enumerate(node.actions)} for x in range(CLASSES)}
+
+	def charts(self) -> dict[str: dict]:
+		return {" ".join(x.history) or "root": self.chart(x) for x in self.nodes}
+
+def solve(stack, small=1, big=2, iterations=1000, buckets=CLASSES, raiseSizes=[], maxRaises=1, limp=True, plus=True, weights=None, equities=None) -> Solver:
+	weights = classWeights() if weights is None else weights
+	equities = classEquities() if equities is None else equities
+	solver = Solver(buildTree(stack, small, big, raiseSizes, maxRaises, limp), Abstraction(weights, equities, buckets), plus)
+	solver.iterate(iterations)
+	return solver
+
+def solveJob(job) -> tuple[float, dict]:
+	stack, options = job
+	solver = solve(stack, **options)
+	return solver.exploitability(), solver.charts()
+
+def solveStacks(stacks, workers=None, **options) -> dict[int: tuple[float, dict]]:
+	# one stack depth per process, the class matrices are worked out once and sent to every job
+	if options.get("weights") is None:
+		options["weights"] = classWeights()
+	if options.get("equities") is None:
+		options["equities"] = classEquities(workers=workers)
+	jobs = [(x, options) for x in stacks]
+	return dict(zip(stacks, batchMap(solveJob, jobs, workers, 1)))
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(description="Solve heads up push/fold or limited raise preflop games")
+	parser.add_argument("--stacks", type=int, nargs="+", default=[20], help="Effective stacks in big blinds")
+	parser.add_argument("--iterations", type=int, default=1000)
+	parser.add_argument("--buckets", type=int, default=CLASSES)
+	parser.add_argument("--raises", type=float, nargs="*", default=[], help="Raise sizes as multiples of the current bet")
+	parser.add_argument("--max-raises", type=int, default=1)
+	parser.add_argument("--no-limp", action="store_true")
+	parser.add_argument("--vanilla", action="store_true", help="Plain cfr instead of cfr+")
+	parser.add_argument("--workers", type=int, default=None)
+	args = parser.parse_args()
+
+	options = {"iterations": args.iterations, "buckets": args.buckets, "raiseSizes": args.raises, "maxRaises": args.max_raises, "limp": not args.no_limp, "plus": not args.vanilla}
+	results = solveStacks([x * 2 for x in args.stacks], args.workers, **options)
+	for stack, (exploitability, charts) in results.items():
+		print(f"{stack // 2} big blinds: exploitable for {exploitability / 2:.4f} big blinds a hand")
+		for history, chart in charts.items():
+			print(f"  {history}: " + ", ".join(f"{x} {sum(y[x] for y in chart.values()) / CLASSES:.1%}" for x in next(iter(chart.values()))))
@@ -0,0 +1,66 @@
+import argparse
+import itertools
+import random
+from cards import CARDS
+from evaluator import rankCards
+from v2 import HoldEm
+
+# compares the evaluator with the *Check chain showdowns used before it, on every 5 card hand or a random sample
+# two differences are deliberate: the wheel is a straight, and two pair is decided by the fifth card rather than the second pair again
+game = HoldEm(1, 2, 100, [])
+
+def chainKey(cards) -> tuple:
+	# the score and kicker values the old findWinners compared, in order
+	x = game.royalFlushCheck(list(cards))
+	if x:
+		return (8,)
+	x = game.straightFlushCheck(list(cards))
+	if x:
+		return (7,) + tuple(y.value for y in x[:5])
+	score, best = game.multiplesCheck(list(cards))
+	if score in [5, 6]:
+		return (score,) + tuple(y.value for y in best)
+	x = game.flushCheck(list(cards))
+	if x:
+		return (4,) + tuple(y.value for y in x[:5])
+	x = game.straightCheck(list(cards))
+	if x:
+		return (3,) + tuple(y.value for y in x[:5])
+	if score == 1:
+		# the old fifth value was the second pair again, the fix compares the card left over
+		pairs = tuple(y.value for y in best[:4])
+		return (1,) + pairs + tuple(y.value for y in cards if y.value not in pairs)
+	return (score,) + tuple(y.value for y in best)
+
+def isWheel(cards) -> bool:
+	return set(x.value for x in cards) == {12, 0, 1, 2, 3}
+
+def check(hands) -> list[tuple]:
+	# a rank shared by hands the chain tells apart, or neighbouring ranks the chain orders the other way or calls equal
+	keys = {}
+	for hand in hands:
+		if isWheel(hand):
+			continue
+		rank = rankCards(hand)
+		key = chainKey(hand)
+		if keys.setdefault(rank, key) != key:
+			return [(rank, keys[rank], key)]
+	ranks = sorted(keys)
+	return [(x, y) for x, y in zip(ranks, ranks[1:]) if keys[x] >= keys[y]]
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(description="Check the evaluator against the old check chain on 5 card hands")
+	parser.add_argument("--sample", type=int, default=None, help="Check this many random hands instead of all of them")
+	parser.add_argument("--seed", type=int, default=0)
+	args = parser.parse_args()
+	if args.sample:
+		rng = random.Random(args.seed)
+		hands = (rng.sample(CARDS, 5) for _ in range(args.sample))
+	else:
+		hands = itertools.combinations(CARDS, 5)
+	problems = check(hands)
+	for problem in problems[:20]:
+		print(problem)
+	print(f"{len(problems)} disagreements")
+	if problems:
+		raise SystemExit(1)
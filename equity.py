@@ -0,0 +1,155 @@
+import functools
+import math
+import random
+import numpy as np
+from canonical import canonicalKey, fromKey
+from evaluator import CARD_BITS, CARD_PRIMES, FLUSHES, UNSUITED, handState
+from vectorized import rankBatch
+
+# Monte Carlo boards scored per batch
+SAMPLE_CHUNK = 1 << 15
+
+class EquityResult:
+	def __init__(self, trials, wins, ties, shares, sharesSquared, exact=False):
+		self.trials = trials
+		self.exact = exact
+		self.wins = wins / trials
+		self.ties = ties / trials
+		self.equity = shares / trials
+		# 95% confidence interval from the variance of each trial's share of the pot
+		variance = max(sharesSquared / trials - self.equity ** 2, 0)
+		self.error = 0 if exact else 1.96 * math.sqrt(variance / trials)
+		self.interval = (max(self.equity - self.error, 0), min(self.equity + self.error, 1))
+
+	def __repr__(self):
+		return f"Win {self.wins:.2%}: Tie {self.ties:.2%}: Equity {self.equity:.2%} ± {self.error:.2%}"
+
+def checkCards(hands, board, dead) -> tuple[list[list[int]], list[int], list[int]]:
+	holeCodes = [[x.code for x in hand] for hand in hands]
+	boardCodes = [x.code for x in board]
+	deadCodes = [x.code for x in dead]
+	used = [x for hand in holeCodes for x in hand] + boardCodes + deadCodes
+	if len(set(used)) != len(used):
+		raise ValueError("Each card can only be used once")
+	if len(boardCodes) > 5:
+		raise ValueError("The board has at most 5 cards")
+	if len(hands) < 2:
+		raise ValueError("Equity needs at least 2 hands")
+	return holeCodes, boardCodes, deadCodes
+
+def setupTallies(holeCodes, boardCodes, deadCodes) -> tuple:
+	players = len(holeCodes)
+	holeStates = [handState(x) for x in holeCodes]
+	holeBits = [x[0] for x in holeStates]
+	holeKeys = [x[1] for x in holeStates]
+	tallies = [[0] * players, [0] * players, [0.0] * players, [0.0] * players]
+	wins, ties, shares, sharesSquared = tallies
+	ranks = [0] * players
+
+	# scores one complete board given its suit bits and prime key
+	def score(bits, key):
+		best = 0
+		count = 0
+		for p in range(players):
+			b = bits | holeBits[p]
+			rank = FLUSHES[b & 0x1FFF] or FLUSHES[b >> 16 & 0x1FFF] or FLUSHES[b >> 32 & 0x1FFF] or FLUSHES[b >> 48] or UNSUITED[key * holeKeys[p]]
+			ranks[p] = rank
+			if rank > best:
+				best = rank
+				count = 1
+			elif rank == best:
+				count += 1
+
+		share = 1 / count
+		for p in range(players):
+			if ranks[p] == best:
+				if count == 1:
+					wins[p] += 1
+				else:
+					ties[p] += 1
+				shares[p] += share
+				sharesSquared[p] += share * share
+
+	used = set(boardCodes + deadCodes + [x for hand in holeCodes for x in hand])
+	cards = [x for x in range(52) if x not in used]
+	return cards, score, tallies
+
+def sampleBoards(cards, missing, trials, generator) -> np.ndarray:
+	# (trials, missing) distinct undealt cards per row, Floyd's sampling one column at a time so no row is ever redrawn
+	size = len(cards)
+	picks = np.empty((trials, missing), dtype=np.int64)
+	for i, top in enumerate(range(size - missing, size)):
+		j = generator.integers(0, top + 1, trials)
+		taken = (picks[:, :i] == j[:, None]).any(axis=1)
+		picks[:, i] = np.where(taken, top, j)
+	return np.asarray(cards, dtype=np.uint8)[picks]
+
+def sampleTallies(holeCodes, boardCodes, deadCodes, trials, rng) -> list[list]:
+	# the boards are drawn and scored a chunk at a time with the batch evaluator, seeded from rng so a seed still gives one result
+	players = len(holeCodes)
+	used = set(boardCodes + deadCodes + [x for hand in holeCodes for x in hand])
+	cards = [x for x in range(52) if x not in used]
+	missing = 5 - len(boardCodes)
+	generator = np.random.default_rng(rng.getrandbits(64))
+	tallies = [[0] * players, [0] * players, [0.0] * players, [0.0] * players]
+	wins, ties, shares, sharesSquared = tallies
+
+	for start in range(0, trials, SAMPLE_CHUNK):
+		size = min(SAMPLE_CHUNK, trials - start)
+		board = np.hstack([np.tile(np.array(boardCodes, dtype=np.uint8), (size, 1)), sampleBoards(cards, missing, size, generator)])
+		ranks = np.stack([rankBatch(np.hstack([np.tile(np.array(x, dtype=np.uint8), (size, 1)), board])) for x in holeCodes])
+		best = ranks == ranks.max(axis=0)
+		count = best.sum(axis=0)
+		share = best / count
+		for p in range(players):
+			wins[p] += int((best[p] & (count == 1)).sum())
+			ties[p] += int((best[p] & (count > 1)).sum())
+			shares[p] += float(share[p].sum())
+			sharesSquared[p] += float((share[p] * share[p]).sum())
+
+	return tallies
+
+def mergeTallies(tallies, other) -> list[list]:
+	return [[a + b for a, b in zip(x, y)] for x, y in zip(tallies, other)]
+
+def talliesToResults(tallies, trials, exact=False) -> list[EquityResult]:
+	wins, ties, shares, sharesSquared = tallies
+	return [EquityResult(trials, wins[p], ties[p], shares[p], sharesSquared[p], exact) for p in range(len(wins))]
+
+def monteCarlo(hands, board=[], dead=[], trials=100000, seed=None, rng=None) -> list[EquityResult]:
+	holeCodes, boardCodes, deadCodes = checkCards(hands, board, dead)
+	rng = rng if rng else random.Random(seed)
+	return talliesToResults(sampleTallies(holeCodes, boardCodes, deadCodes, trials, rng), trials)
+
+def enumerateTallies(holeCodes, boardCodes, deadCodes) -> tuple[int, list[list]]:
+	cards, score, tallies = setupTallies(holeCodes, boardCodes, deadCodes)
+	boardBits, boardKey = handState(boardCodes)
+	size = len(cards)
+	runouts = 0
+
+	# runouts sharing their first cards share the partial board state
+	def walk(start, left, bits, key):
+		nonlocal runouts
+		if not left:
+			score(bits, key)
+			runouts += 1
+			return
+		for i in range(start, size - left + 1):
+			code = cards[i]
+			walk(i + 1, left - 1, bits | CARD_BITS[code], key * CARD_PRIMES[code])
+
+	walk(0, 5 - len(boardCodes), boardBits, boardKey)
+	return runouts, tallies
+
+# repeated spots are served from here, keyed by hands, board and dead cards up to a change of suits
+EXACT_CACHE_SIZE = 4096
+
+@functools.lru_cache(maxsize=EXACT_CACHE_SIZE)
+def cachedTallies(key, players) -> tuple[int, list[list]]:
+	groups = fromKey(key, players + 2)
+	return enumerateTallies(groups[:players], groups[players], groups[players + 1])
+
+def exactEquity(hands, board=[], dead=[]) -> list[EquityResult]:
+	holeCodes, boardCodes, deadCodes = checkCards(hands, board, dead)
+	runouts, tallies = cachedTallies(canonicalKey(holeCodes + [boardCodes, deadCodes]), len(holeCodes))
+	return talliesToResults(tallies, runouts, True)
@@ -0,0 +1,158 @@
+import itertools
+
+# a card code is value * 4 + suit, values 0-12 (2 to Ace) and suits 0-3
+# a rank is category << 20 followed by up to five 4-bit card values, so higher ranks are better hands
+
+handNames = {0: "High card", 1: "Pair", 2: "Two pair", 3: "Three of a kind", 4: "Straight", 5: "Flush", 6: "Full house", 7: "Four of a kind", 8: "Straight flush"}
+
+PRIMES = [2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41]
+
+# per card lookups so a hand is just a bitwise or of suit bits and a product of rank primes
+CARD_BITS = [1 << ((code & 3) * 16 + (code >> 2)) for code in range(52)]
+CARD_PRIMES = [PRIMES[code >> 2] for code in range(52)]
+
+def packRank(category, values) -> int:
+	rank = category
+	for i in range(5):
+		rank = (rank << 4) | (values[i] if i < len(values) else 0)
+	return rank
+
+def straightTop(mask) -> int:
+	for top in range(12, 3, -1):
+		window = 0b11111 << (top - 4)
+		if mask & window == window:
+			return top
+	# ace low straight
+	if mask & 0b1000000001111 == 0b1000000001111:
+		return 3
+	return -1
+
+def flushRank(mask) -> int:
+	top = straightTop(mask)
+	if top >= 0:
+		return packRank(8, [top])
+	return packRank(5, [x for x in range(12, -1, -1) if mask >> x & 1][:5])
+
+def countsRank(counts) -> int:
+	values = [x for x in range(12, -1, -1) if counts[x]]
+	quads = [x for x in values if counts[x] == 4]
+	trips = [x for x in values if counts[x] == 3]
+	pairs = [x for x in values if counts[x] == 2]
+
+	if quads:
+		return packRank(7, [quads[0], [x for x in values if x != quads[0]][0]])
+
+	if trips and (len(trips) > 1 or pairs):
+		return packRank(6, [trips[0], max(trips[1:] + pairs)])
+
+	mask = sum(1 << x for x in values)
+	top = straightTop(mask)
+	if top >= 0:
+		return packRank(4, [top])
+
+	if trips:
+		return packRank(3, [trips[0]] + [x for x in values if x != trips[0]][:2])
+
+	if len(pairs) > 1:
+		return packRank(2, pairs[:2] + [x for x in values if x not in pairs[:2]][:1])
+
+	if pairs:
+		return packRank(1, [pairs[0]] + [x for x in values if x != pairs[0]][:3])
+
+	return packRank(0, values[:5])
+
+def buildTables():
+	# every 13 bit suit mask with at least 5 cards in it, 0 means no flush
+	flushes = [0] * 8192
+	for mask in range(8192):
+		if bin(mask).count("1") >= 5:
+			flushes[mask] = flushRank(mask)
+
+	# every multiset of 5-7 values keyed by the product of their primes
+	unsuited = {}
+	for number in range(5, 8):
+		for values in itertools.combinations_with_replacement(range(13), number):
+			counts = [0] * 13
+			for x in values:
+				counts[x] += 1
+			if max(counts) > 4:
+				continue
+			key = 1
+			for x in values:
+				key *= PRIMES[x]
+			unsuited[key] = countsRank(counts)
+	return flushes, unsuited
+
+FLUSHES, UNSUITED = buildTables()
+
+def handState(codes) -> tuple[int, int]:
+	bits = 0
+	key = 1
+	for code in codes:
+		bits |= CARD_BITS[code]
+		key *= CARD_PRIMES[code]
+	return bits, key
+
+def rankState(bits, key) -> int:
+	# at most one suit can hold 5 of 7 cards and a flush always beats the unsuited hand
+	rank = FLUSHES[bits & 0x1FFF] or FLUSHES[bits >> 16 & 0x1FFF] or FLUSHES[bits >> 32 & 0x1FFF] or FLUSHES[bits >> 48]
+	if rank:
+		return rank
+	return UNSUITED[key]
+
+def rankCodes(codes) -> int:
+	return rankState(*handState(codes))
+
+def rankCards(cards) -> int:
+	return rankCodes([x.code for x in cards])
+
+def handCategory(rank) -> int:
+	return rank >> 20
+
+def smallCategory(codes) -> int:
+	# made hand category of fewer than 5 cards, only pairs, trips and quads are possible
+	counts = sorted([[x >> 2 for x in codes].count(v) for v in set(x >> 2 for x in codes)], reverse=True)
+	if counts[0] == 4:
+		return 7
+	if counts[0] == 3:
+		return 3
+	if counts[0] == 2:
+		return 2 if len(counts) > 1 and counts[1] == 2 else 1
+	return 0
+
+# one player's hand as the board comes out, each new card is an or and a multiply followed by a single rank lookup
+class HandTracker:
+	def __init__(self, hole):
+		self.codes = [x.code for x in hole]
+		self.bits, self.key = handState(self.codes)
+		self.rank = None
+		self.knownOuts = None
+
+	def __repr__(self):
+		return f"{handNames[self.category()]}" + (f": {len(self.outs())} outs" if 5 <= len(self.codes) < 7 else "")
+
+	def add(self, cards):
+		for card in cards:
+			self.codes.append(card.code)
+			self.bits |= CARD_BITS[card.code]
+			self.key *= CARD_PRIMES[card.code]
+		self.rank = rankState(self.bits, self.key) if len(self.codes) >= 5 else None
+		self.knownOuts = None
+
+	def category(self) -> int:
+		if self.rank is None:
+			return smallCategory(self.codes)
+		return handCategory(self.rank)
+
+	def outs(self, dead=None) -> list[int]:
+		# unseen cards that would improve the made hand category on the next street, none before the flop or on the river
+		if not 5 <= len(self.codes) < 7:
+			return []
+		if self.knownOuts is None:
+			category = self.category()
+			self.knownOuts = [x for x in range(52) if x not in self.codes and handCategory(rankState(self.bits | CARD_BITS[x], self.key * CARD_PRIMES[x])) > category]
+		if dead:
+			# the cache holds the outs with no dead cards, dead cards only take outs away
+			dead = set(x.code for x in dead)
+			return [x for x in self.knownOuts if x not in dead]
+		return self.knownOuts
@@ -0,0 +1,184 @@
+from v2 import HoldEm, resolvePots
+
+# a hand as plain tuples indexed by seat, transitions return a new state so branching never copies more than a few tuples
+# states follow Player: 0 folded or empty, 1 at the table bet, 2 needs to call, 3 all-in
+class GameState:
+	__slots__ = ("button", "big", "stacks", "bets", "contributions", "states", "holes", "board", "bet", "pending", "toAct")
+
+	def __init__(self, button, big, stacks, bets, contributions, states, holes, board, bet, pending, toAct):
+		self.button = button
+		self.big = big
+		self.stacks = stacks
+		self.bets = bets
+		self.contributions = contributions
+		self.states = states
+		# card codes, holes has an empty tuple for empty seats
+		self.holes = holes
+		self.board = board
+		self.bet = bet
+		# seats still to act after toAct, as a bitmask like the betting loop
+		self.pending = pending
+		self.toAct = toAct
+
+	def __repr__(self):
+		return f"GameState: to act {self.toAct}: bet {self.bet}: pot {sum(self.contributions)}: stacks {self.stacks}"
+
+	def __eq__(self, other):
+		return isinstance(other, GameState) and all(getattr(self, x) == getattr(other, x) for x in self.__slots__)
+
+	def __hash__(self):
+		return hash(tuple(getattr(self, x) for x in self.__slots__))
+
+	def replace(self, **changes) -> "GameState":
+		values = {x: getattr(self, x) for x in self.__slots__}
+		values.update(changes)
+		return GameState(**values)
+
+	def clone(self) -> "GameState":
+		# nothing is shared mutably, so a clone is the same object
+		return self
+
+def stateMask(states, wanted) -> int:
+	mask = 0
+	for seat, state in enumerate(states):
+		if state in wanted:
+			mask |= 1 << seat
+	return mask
+
+def nextSeat(seat, mask) -> int:
+	after = mask >> (seat + 1) << (seat + 1)
+	if after:
+		return (after & -after).bit_length() - 1
+	if mask:
+		return (mask & -mask).bit_length() - 1
+	return -1
+
+def toCall(state: GameState, seat) -> int:
+	return state.bet - state.bets[seat]
+
+def legalActions(state: GameState) -> list[str]:
+	# the same choices getPossibleActions offers the player to act
+	seat = state.toAct
+	if seat < 0:
+		return []
+	if state.states[seat] == 1:
+		return ["Check", "Jam", "Raise" if state.bet else "Bet"]
+	if state.states[seat] == 2:
+		return ["Fold", "Call", "Raise", "Jam"]
+	return []
+
+def placeBet(state: GameState, seat, bet) -> GameState:
+	# handleBet over tuples
+	stacks = list(state.stacks)
+	states = list(state.states)
+	if bet >= stacks[seat]:
+		bet = stacks[seat]
+		states[seat] = 3
+	else:
+		states[seat] = 1
+	stacks[seat] -= bet
+	contributions = list(state.contributions)
+	contributions[seat] += bet
+	bets = list(state.bets)
+	bets[seat] += bet
+
+	current = state.bet
+	if bets[seat] > current:
+		current = bets[seat]
+		for other, x in enumerate(states):
+			if x == 1 and bets[other] < current:
+				states[other] = 2
+	return state.replace(stacks=tuple(stacks), bets=tuple(bets), contributions=tuple(contributions), states=tuple(states), bet=current)
+
+def applyAction(state: GameState, action: str) -> GameState:
+	# the state after the player to act takes the action, with the next player to act or toAct -1 once the street is over
+	seat = state.toAct
+	if seat < 0:
+		raise ValueError("Nobody is to act")
+	raised = False
+	if action == "fold" or action == "check":
+		states = list(state.states)
+		states[seat] = 0 if action == "fold" else 1
+		state = state.replace(states=tuple(states))
+	elif action == "call":
+		state = placeBet(state, seat, toCall(state, seat))
+	elif action.startswith("bet "):
+		state = placeBet(state, seat, int(action.split(" ")[1]))
+		raised = True
+	elif action.startswith("raise "):
+		state = placeBet(state, seat, int(action.split(" ")[1]) - state.bets[seat])
+		raised = True
+	elif action == "jam":
+		if state.stacks[seat] > toCall(state, seat):
+			state = placeBet(state, seat, state.bets[seat] + state.stacks[seat])
+			raised = True
+		else:
+			state = placeBet(state, seat, toCall(state, seat))
+	else:
+		raise SyntaxError("Please enter a valid instruction.")
+
+	pending = stateMask(state.states, [2]) if raised else state.pending
+	toAct = nextSeat(seat, pending)
+	if toAct >= 0:
+		pending &= ~(1 << toAct)
+	return state.replace(pending=pending, toAct=toAct)
+
+def dealStreet(state: GameState, cards) -> GameState:
+	# bets go into the pot and the action starts after the button again
+	pending = stateMask(state.states, [1, 2])
+	toAct = nextSeat(state.button, pending)
+	if toAct >= 0:
+		pending &= ~(1 << toAct)
+	return state.replace(board=state.board + tuple(cards), bets=(0,) * len(state.bets), bet=0, pending=pending, toAct=toAct)
+
+def handOver(state: GameState) -> bool:
+	# checkIfOver once the street's betting is done
+	return state.toAct < 0 and (sum(x == 1 for x in state.states) <= 1 or len(state.board) == 5)
+
+def pots(state: GameState) -> list:
+	# the pots with seat numbers in place of players
+	contributions = {x: y for x, y in enumerate(state.contributions) if y}
+	return resolvePots(contributions, [x for x, y in enumerate(state.states) if y])
+
+class Line:
+	# a path through the game tree, undo just drops back to the previous state
+	def __init__(self, state: GameState):
+		self.states = [state]
+
+	def __repr__(self):
+		return f"Line: {len(self.states) - 1} actions: {self.state}"
+
+	@property
+	def state(self) -> GameState:
+		return self.states[-1]
+
+	def apply(self, action) -> GameState:
+		self.states.append(applyAction(self.states[-1], action))
+		return self.states[-1]
+
+	def deal(self, cards) -> GameState:
+		self.states.append(dealStreet(self.states[-1], cards))
+		return self.states[-1]
+
+	def undo(self) -> GameState:
+		if len(self.states) > 1:
+			self.states.pop()
+		return self.states[-1]
+
+def snapshot(game: HoldEm) -> GameState:
+	# the hand in progress, players missing from a seat count as folded with no chips
+	size = game.seats.size
+	players = [game.seats[x] for x in range(size)]
+	return GameState(
+		game.seats.button,
+		game.big,
+		tuple(x.money if x else 0 for x in players),
+		tuple(game.bets.get(x, 0) if x else 0 for x in players),
+		tuple(game.contributions.get(x, 0) if x else 0 for x in players),
+		tuple(x.state if x else 0 for x in players),
+		tuple(tuple(y.code for y in game.playerHands.get(x, [])) if x else () for x in players),
+		tuple(x.code for x in game.community),
+		game.bet,
+		game.pending,
+		game.toAct,
+	)
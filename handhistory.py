@@ -0,0 +1,162 @@
+import mmap
+import os
+import struct
+
+# every record is 16 bytes: type, seat, action, street, amount, extra, up to 3 card codes
+RECORD = struct.Struct("<BBBBII3Bx")
+HEADER = b"HHv1"
+NO_CARD = 255
+
+# Hand: seat is the button, action the number dealt in, amount the hand number and extra the deck seed
+# Table: seat is the number of seats, amount the small blind and extra the big blind
+# Seat: amount is the stack before the blinds and extra the player id, the names are kept in path.names
+HAND, SEAT, BLIND, HOLE, ACTION, BOARD, WIN, END, TABLE = range(9)
+recordNames = {HAND: "Hand", SEAT: "Seat", BLIND: "Blind", HOLE: "Hole", ACTION: "Action", BOARD: "Board", WIN: "Win", END: "End", TABLE: "Table"}
+
+# actions are stored by their index in HoldEm.possible
+actionCodes = {"fold": 0, "check": 1, "call": 2, "bet": 3, "raise": 4, "jam": 5}
+actionNames = {y: x for x, y in actionCodes.items()}
+streetCodes = {"Preflop": 0, "Flop": 1, "Turn": 2, "River": 3, "Runout": 4}
+
+def cardBytes(cards) -> list[int]:
+	codes = [x.code for x in cards][:3]
+	return codes + [NO_CARD] * (3 - len(codes))
+
+# a listener for the game that appends each hand to the log as it is played
+class HandHistoryWriter:
+	def __init__(self, path, game, bufferSize=1 << 16):
+		self.path = path
+		self.game = game
+		self.names = {}
+		if os.path.exists(path + ".names"):
+			with open(path + ".names") as f:
+				self.names = {x: i for i, x in enumerate(f.read().splitlines())}
+		self.namesFile = open(path + ".names", "a")
+		new = not os.path.exists(path) or not os.path.getsize(path)
+		self.file = open(path, "ab", buffering=bufferSize)
+		if new:
+			self.file.write(HEADER)
+		self.hands = 0
+		self.street = 0
+		self.boardCards = 0
+
+	def playerId(self, name) -> int:
+		if name not in self.names:
+			self.names[name] = len(self.names)
+			self.namesFile.write(name + "\n")
+			self.namesFile.flush()
+		return self.names[name]
+
+	def write(self, kind, seat=0, action=0, street=0, amount=0, extra=0, cards=[]):
+		self.file.write(RECORD.pack(kind, seat, action, street, amount, extra, *cardBytes(cards)))
+
+	def __call__(self, event, data):
+		if event == "newRound":
+			self.hands += 1
+			self.street = 0
+			self.boardCards = 0
+			dealt = [x for x in data["players"] if x.state == 2]
+			self.write(HAND, data["button"].seat, len(dealt), 0, self.hands, data["seed"])
+			self.write(TABLE, self.game.seats.size, 0, 0, self.game.small, self.game.big)
+			for player in dealt:
+				self.write(SEAT, player.seat, 0, 0, player.money, self.playerId(player.name))
+		elif event == "blind":
+			self.write(BLIND, data["player"].seat, 0, 0, data["amount"])
+		elif event == "holeCards":
+			for player, cards in data["hands"].items():
+				self.write(HOLE, player.seat, cards=cards)
+		elif event == "action":
+			self.write(ACTION, data["player"].seat, actionCodes[data["action"]], self.street, data["amount"])
+		elif event == "board":
+			self.street = streetCodes[data["street"]]
+			new = data["community"][self.boardCards:]
+			self.boardCards = len(data["community"])
+			for i in range(0, len(new), 3):
+				self.write(BOARD, 0, 0, self.street, cards=new[i:i + 3])
+		elif event == "win":
+			self.write(WIN, data["player"].seat, 0, self.street, data["amount"])
+		elif event == "handOver":
+			self.write(END)
+
+	def flush(self):
+		self.file.flush()
+
+	def close(self):
+		self.file.close()
+		self.namesFile.close()
+
+# reads the log through a memory map, records are only unpacked when they are asked for
+class HandHistoryReader:
+	def __init__(self, path):
+		self.path = path
+		self.names = []
+		if os.path.exists(path + ".names"):
+			with open(path + ".names") as f:
+				self.names = f.read().splitlines()
+		self.file = open(path, "rb")
+		self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+		if self.map[:len(HEADER)] != HEADER:
+			raise ValueError(f"{path} is not a hand history")
+		self.start = len(HEADER)
+		self.offsets = None
+
+	def __len__(self):
+		return (len(self.map) - self.start) // RECORD.size
+
+	def close(self):
+		self.map.close()
+		self.file.close()
+
+	def records(self, start=0, stop=None):
+		stop = len(self) if stop is None else stop
+		view = memoryview(self.map)[self.start + start * RECORD.size:self.start + stop * RECORD.size]
+		yield from RECORD.iter_unpack(view)
+		view.release()
+
+	def types(self) -> bytes:
+		# just the type byte of every record, one byte per record
+		return self.map[self.start::RECORD.size]
+
+	def handOffsets(self) -> list[int]:
+		if self.offsets is None:
+			types = self.types()
+			self.offsets = []
+			i = types.find(HAND)
+			while i >= 0:
+				self.offsets.append(i)
+				i = types.find(HAND, i + 1)
+		return self.offsets
+
+	def handCount(self) -> int:
+		return len(self.handOffsets())
+
+	def hand(self, number) -> list[tuple]:
+		offsets = self.handOffsets()
+		stop = offsets[number + 1] if number + 1 < len(offsets) else len(self)
+		return list(self.records(offsets[number], stop))
+
+	def handRanges(self, size) -> list[tuple[int, int]]:
+		# start and stop records of runs of size whole hands, small enough to send to workers that open the log themselves
+		offsets = self.handOffsets()
+		return [(offsets[i], offsets[i + size] if i + size < len(offsets) else len(self)) for i in range(0, len(offsets), size)]
+
+	def hands(self, start=0, stop=None):
+		hand = []
+		for record in self.records(start, stop):
+			if record[0] == HAND and hand:
+				yield hand
+				hand = []
+			hand.append(record)
+		if hand:
+			yield hand
+
+	def scan(self, kind):
+		# only the records of one type, found from the type bytes without unpacking the rest
+		types = self.types()
+		i = types.find(kind)
+		while i >= 0:
+			yield RECORD.unpack_from(self.map, self.start + i * RECORD.size)
+			i = types.find(kind, i + 1)
+
+	def name(self, playerId) -> str:
+		return self.names[playerId]
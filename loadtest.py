@@ -0,0 +1,95 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+from agents import RandomAgent
+from server import TableServer
+from tables import DecisionStats
+
+# bot clients that join a table server and play random actions, timing each action until the server confirms it
+class LoadClient:
+	def __init__(self, name, rng, stats: DecisionStats):
+		self.name = name
+		self.agent = RandomAgent(rng)
+		self.stats = stats
+		self.table = None
+		self.messages = 0
+		self.actions = 0
+
+	async def play(self, host, port, seatWait):
+		# a bot that is not given a seat within seatWait seconds gives up rather than holding up the test
+		reader, writer = await asyncio.open_connection(host, port)
+		writer.write(json.dumps({"type": "join", "name": self.name}).encode() + b"\n")
+		sent = None
+		while True:
+			try:
+				line = await asyncio.wait_for(reader.readline(), None if self.table is not None else seatWait)
+			except asyncio.TimeoutError:
+				break
+			if not line:
+				break
+			self.messages += 1
+			message = json.loads(line)
+			if message["type"] == "act":
+				writer.write(json.dumps({"type": "action", "action": self.agent(message)}).encode() + b"\n")
+				self.messages += 1
+				self.actions += 1
+				sent = time.perf_counter()
+			elif message["type"] == "acted" and sent is not None:
+				self.stats.record(time.perf_counter() - sent)
+				sent = None
+			elif message["type"] == "seated":
+				self.table = message["table"]
+			elif message["type"] == "over":
+				break
+		writer.close()
+
+async def loadTest(host="127.0.0.1", port=9999, clients=600, seed=0, serve=False, seats=6, hands=100, timeout=5.0, wait=1.0) -> dict:
+	# serve starts a server in this process so the test runs on its own
+	server = None
+	if serve:
+		server = TableServer(host, port, seats, hands=hands, timeout=timeout, seed=seed, lobbyWait=wait)
+		await server.start()
+		port = server.port
+	rng = random.Random(seed)
+	stats = DecisionStats(rng)
+	bots = [LoadClient(f"Bot{i}", random.Random(f"{seed}:{i}"), stats) for i in range(clients)]
+
+	start = time.perf_counter()
+	await asyncio.gather(*[x.play(host, port, wait + timeout) for x in bots])
+	seconds = time.perf_counter() - start
+	if server:
+		await server.close()
+
+	messages = sum(x.messages for x in bots)
+	return {
+		"clients": clients,
+		"tables": len(set(x.table for x in bots if x.table is not None)),
+		"unseated": len([x for x in bots if x.table is None]),
+		"seconds": seconds,
+		"actions": stats.count,
+		"messages": messages,
+		"messagesPerSecond": messages / seconds if seconds else 0.0,
+		"actionP50": stats.percentile(50),
+		"actionP99": stats.percentile(99),
+		"actionMax": stats.longest,
+		"timeouts": server.timeouts if server else None,
+	}
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(description="Load test a HoldEm table server with random bots")
+	parser.add_argument("--host", default="127.0.0.1")
+	parser.add_argument("--port", type=int, default=9999)
+	parser.add_argument("--clients", type=int, default=600)
+	parser.add_argument("--seed", type=int, default=0)
+	parser.add_argument("--serve", action="store_true", help="Start a server in this process on a free port")
+	parser.add_argument("--seats", type=int, default=6)
+	parser.add_argument("--hands", type=int, default=100)
+	parser.add_argument("--timeout", type=float, default=5.0)
+	parser.add_argument("--wait", type=float, default=1.0, help="Seconds the server lets clients wait in the lobby before a short handed table starts")
+	args = parser.parse_args()
+	port = 0 if args.serve else args.port
+	report = asyncio.run(loadTest(args.host, port, args.clients, args.seed, args.serve, args.seats, args.hands, args.timeout, args.wait))
+	for key, value in report.items():
+		print(f"{key}: {value:.4f}" if isinstance(value, float) else f"{key}: {value}")
@@ -0,0 +1,148 @@
+import bisect
+import time
+from v2 import HoldEm
+
+# upper bounds in seconds, anything slower only shows up in the +Inf bucket
+BUCKETS = [x * 10.0 ** e for e in range(-6, 0) for x in (1, 2.5, 5)] + [1.0]
+PHASES = ["newRound", "betting", "handleBet", "handleSidePot", "findWinners", "end"]
+GENERATORS = ["newRound", "betting"]
+
+class Histogram:
+	def __init__(self, buckets=BUCKETS):
+		self.buckets = buckets
+		self.reset()
+
+	def __repr__(self):
+		return f"Histogram: {self.count} samples: mean {self.mean() * 1e6:.1f}us"
+
+	def reset(self):
+		self.counts = [0] * (len(self.buckets) + 1)
+		self.total = 0.0
+		self.count = 0
+
+	def observe(self, seconds):
+		self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+		self.total += seconds
+		self.count += 1
+
+	def mean(self) -> float:
+		return self.total / self.count if self.count else 0.0
+
+	def quantile(self, q) -> float:
+		# the upper bound of the bucket holding the quantile
+		target = q * self.count
+		seen = 0
+		for bound, count in zip(self.buckets + [float("inf")], self.counts):
+			seen += count
+			if seen >= target and seen:
+				return bound
+		return 0.0
+
+	def merge(self, other: "Histogram"):
+		self.counts = [x + y for x, y in zip(self.counts, other.counts)]
+		self.total += other.total
+		self.count += other.count
+
+class Metrics:
+	def __init__(self, prefix="holdem"):
+		self.prefix = prefix
+		self.phases = {x: Histogram() for x in PHASES}
+		self.counters = {}
+
+	def __repr__(self):
+		return f"Metrics: {', '.join(f'{x} {y.count}' for x, y in self.phases.items())}"
+
+	def count(self, name, amount=1):
+		self.counters[name] = self.counters.get(name, 0) + amount
+
+	def reset(self):
+		# in place, instrumented games keep recording into the same histograms
+		for histogram in self.phases.values():
+			histogram.reset()
+		self.counters.clear()
+
+	def merge(self, other: "Metrics"):
+		for name, histogram in other.phases.items():
+			self.phases.setdefault(name, Histogram()).merge(histogram)
+		for name, amount in other.counters.items():
+			self.count(name, amount)
+
+	def snapshot(self) -> dict:
+		return {
+			"phases": {x: {"count": y.count, "seconds": y.total, "p50": y.quantile(0.5), "p99": y.quantile(0.99)} for x, y in self.phases.items()},
+			"counters": dict(self.counters),
+		}
+
+	def exposition(self) -> str:
+		# prometheus text format, phases are one histogram labelled by phase
+		name = f"{self.prefix}_phase_seconds"
+		lines = [f"# HELP {name} Time spent in each HoldEm phase, not counting time waiting on agents", f"# TYPE {name} histogram"]
+		for phase, histogram in self.phases.items():
+			seen = 0
+			for bound, count in zip(histogram.buckets, histogram.counts):
+				seen += count
+				lines.append(f'{name}_bucket{{phase="{phase}",le="{bound:g}"}} {seen}')
+			lines.append(f'{name}_bucket{{phase="{phase}",le="+Inf"}} {histogram.count}')
+			lines.append(f'{name}_sum{{phase="{phase}"}} {histogram.total:.9f}')
+			lines.append(f'{name}_count{{phase="{phase}"}} {histogram.count}')
+		for counter, value in self.counters.items():
+			lines.append(f"# TYPE {self.prefix}_{counter}_total counter")
+			lines.append(f"{self.prefix}_{counter}_total {value}")
+		return "\n".join(lines) + "\n"
+
+def timed(func, histogram):
+	def wrapper(*args):
+		start = time.perf_counter()
+		try:
+			return func(*args)
+		finally:
+			histogram.observe(time.perf_counter() - start)
+	return wrapper
+
+def timedSteps(func, histogram):
+	# the clock only runs between a send and the next yield so time spent by agents is left out
+	def wrapper(*args):
+		steps = func(*args)
+		elapsed = 0.0
+		action = None
+		while True:
+			start = time.perf_counter()
+			try:
+				request = steps.send(action)
+			except StopIteration:
+				histogram.observe(elapsed + time.perf_counter() - start)
+				return
+			elapsed += time.perf_counter() - start
+			action = yield request
+	return wrapper
+
+def counted(func, metrics, name):
+	def wrapper(*args, **kwargs):
+		metrics.count(name)
+		return func(*args, **kwargs)
+	return wrapper
+
+def instrument(game: HoldEm, metrics=None) -> Metrics:
+	# wraps the game's own methods, a game that was never instrumented runs the plain methods with no overhead
+	metrics = metrics if metrics else Metrics()
+	uninstrument(game)
+	for phase in PHASES:
+		method = getattr(game, phase)
+		wrap = timedSteps if phase in GENERATORS else timed
+		setattr(game, phase, wrap(method, metrics.phases[phase]))
+	# seat list rebuilds are the bookkeeping most likely to grow with the table
+	game.seats.createList = counted(game.seats.createList, metrics, "createList")
+	game.metricsListener = lambda event, data: metrics.count(f"{event}Events")
+	game.listeners.append(game.metricsListener)
+	game.metrics = metrics
+	return metrics
+
+def uninstrument(game: HoldEm):
+	if "metrics" not in game.__dict__:
+		return
+	for phase in PHASES:
+		del game.__dict__[phase]
+	del game.seats.__dict__["createList"]
+	game.listeners.remove(game.metricsListener)
+	del game.metricsListener
+	del game.metrics
@@ -0,0 +1,143 @@
+import argparse
+import itertools
+import mmap
+import os
+import random
+import struct
+from batch import batchMap
+from canonical import canonicalKey, fromKey
+from cards import shortVals
+from equity import sampleTallies
+
+# the 169 starting hands sit in a 13x13 grid, suited hands and pairs at [high][low] and offsuit hands at [low][high]
+CLASSES = 169
+PAIRS = CLASSES * (CLASSES + 1) // 2
+HEADER = struct.Struct("<4sBI")
+MAGIC = b"PFv1"
+SCALE = 65535
+paths = {2: os.path.join(os.path.dirname(os.path.abspath(__file__)), "preflop2.bin"), 3: os.path.join(os.path.dirname(os.path.abspath(__file__)), "preflop3.bin")}
+
+def classIndex(high, low, suited) -> int:
+	if high < low:
+		high, low = low, high
+	if suited or high == low:
+		return high * 13 + low
+	return low * 13 + high
+
+def handClass(cards) -> int:
+	a, b = cards
+	return classIndex(a.value, b.value, a.suit == b.suit)
+
+def className(index) -> str:
+	row, column = divmod(index, 13)
+	if row == column:
+		return shortVals[row] * 2
+	if row > column:
+		return shortVals[row] + shortVals[column] + "s"
+	return shortVals[column] + shortVals[row] + "o"
+
+def parseClass(name) -> int:
+	high = shortVals.index(name[0].upper())
+	low = shortVals.index(name[1].upper())
+	return classIndex(high, low, name[2:3].lower() == "s")
+
+def classCombos(index) -> list[tuple[int, int]]:
+	row, column = divmod(index, 13)
+	if row == column:
+		return [(row * 4 + a, row * 4 + b) for a, b in itertools.combinations(range(4), 2)]
+	high, low = max(row, column), min(row, column)
+	if row > column:
+		return [(high * 4 + s, low * 4 + s) for s in range(4)]
+	return [(high * 4 + a, low * 4 + b) for a in range(4) for b in range(4) if a != b]
+
+def pairIndex(a, b) -> int:
+	# position of an unordered pair of classes in a triangular table
+	if a > b:
+		a, b = b, a
+	return a * CLASSES - a * (a - 1) // 2 + b - a
+
+def matchupEquity(job) -> list[float]:
+	# equity of every class in the matchup, averaged over the suit combos that do not share cards
+	classes, trials, seed = job
+	rng = random.Random(seed)
+	assignments = [x for x in itertools.product(*[classCombos(c) for c in classes]) if len(set(sum(x, ()))) == 2 * len(classes)]
+	if len(assignments) * 50 > trials:
+		assignments = rng.sample(assignments, max(1, trials // 50))
+
+	# combos that only differ by suits are simulated once and weighted by how often they came up
+	weights = {}
+	for hands in assignments:
+		key = canonicalKey([list(x) for x in hands])
+		weights[key] = weights.get(key, 0) + 1
+	each = max(1, trials // len(weights))
+
+	shares = [0.0] * len(classes)
+	for key, weight in weights.items():
+		tallies = sampleTallies(fromKey(key, len(classes)), [], [], each, rng)
+		for i in range(len(classes)):
+			shares[i] += tallies[2][i] / each * weight
+	return [x / len(assignments) for x in shares]
+
+def build(players=2, trials=10000, workers=None, path=None, seed=0):
+	path = path if path else paths[players]
+	if players == 2:
+		jobs = [((a, b), trials, f"{seed}:{a}:{b}") for a in range(CLASSES) for b in range(a, CLASSES)]
+		values = [0] * (CLASSES * CLASSES)
+		for ((a, b), _, _), result in zip(jobs, batchMap(matchupEquity, jobs, workers, 100)):
+			values[a * CLASSES + b] = round(result[0] * SCALE)
+			values[b * CLASSES + a] = round(result[1] * SCALE)
+	elif players == 3:
+		jobs = [((a, b, c), trials, f"{seed}:{a}:{b}:{c}") for a, b, c in itertools.combinations_with_replacement(range(CLASSES), 3)]
+		values = [0] * (CLASSES * PAIRS)
+		for (classes, _, _), result in zip(jobs, batchMap(matchupEquity, jobs, workers, 100)):
+			for i in range(3):
+				others = classes[:i] + classes[i + 1:]
+				values[classes[i] * PAIRS + pairIndex(*others)] = round(result[i] * SCALE)
+	else:
+		raise ValueError("Only 2 and 3 player tables can be built")
+
+	with open(path, "wb") as f:
+		f.write(HEADER.pack(MAGIC, players, trials))
+		f.write(struct.pack(f"<{len(values)}H", *values))
+
+tables = {}
+
+def loadTable(players) -> mmap.mmap:
+	# mapped on first use, later lookups only read the two bytes they need
+	if players not in tables:
+		if not os.path.exists(paths[players]):
+			raise FileNotFoundError(f"{paths[players]} is missing, build it with: python preflop.py --players {players}")
+		with open(paths[players], "rb") as f:
+			table = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+		magic, count, _ = HEADER.unpack_from(table)
+		if magic != MAGIC or count != players:
+			raise ValueError(f"{paths[players]} is not a {players} player preflop table")
+		tables[players] = table
+	return tables[players]
+
+def toClass(hand) -> int:
+	if isinstance(hand, str):
+		return parseClass(hand)
+	if isinstance(hand, int):
+		return hand
+	return handClass(hand)
+
+def headsUp(hand, other) -> float:
+	# hands are two cards, a class name such as "AKs" or a class index
+	table = loadTable(2)
+	index = toClass(hand) * CLASSES + toClass(other)
+	return struct.unpack_from("<H", table, HEADER.size + index * 2)[0] / SCALE
+
+def threeWay(hand, other, third) -> float:
+	table = loadTable(3)
+	index = toClass(hand) * PAIRS + pairIndex(toClass(other), toClass(third))
+	return struct.unpack_from("<H", table, HEADER.size + index * 2)[0] / SCALE
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(description="Build the preflop all-in equity tables")
+	parser.add_argument("--players", type=int, default=2, choices=[2, 3])
+	parser.add_argument("--trials", type=int, default=10000)
+	parser.add_argument("--workers", type=int, default=None)
+	parser.add_argument("--seed", type=int, default=0)
+	args = parser.parse_args()
+	build(args.players, args.trials, args.workers, seed=args.seed)
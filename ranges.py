@@ -0,0 +1,171 @@
+import itertools
+import random
+import numpy as np
+from cards import parseCards, shortName, CARDS, shortVals
+from evaluator import CARD_BITS, CARD_PRIMES, handState, rankState
+from preflop import classCombos, classIndex
+
+# a range is a weight for every two card combo, combos are sorted pairs of card codes
+class Range:
+	def __init__(self, combos):
+		self.combos = combos
+
+	def __repr__(self):
+		return f"Range: {len(self.combos)} combos"
+
+	def __len__(self):
+		return len(self.combos)
+
+	def __iter__(self):
+		return iter(self.combos)
+
+	def remove(self, cards) -> "Range":
+		# drop combos that use any of the board or dead cards
+		blocked = set(x.code for x in cards)
+		return Range({x: y for x, y in self.combos.items() if x[0] not in blocked and x[1] not in blocked})
+
+	def names(self) -> list[str]:
+		return [shortName(CARDS[x[1]]) + shortName(CARDS[x[0]]) for x in self.combos]
+
+def addClass(combos, high, low, suits, weight):
+	# suits is "s", "o" or "" for both
+	kinds = [True] if suits == "s" else [False] if suits == "o" else [True, False]
+	if high == low:
+		kinds = [False]
+	for suited in kinds:
+		for a, b in classCombos(classIndex(high, low, suited)):
+			combos[(min(a, b), max(a, b))] = weight
+
+def parseClass(text, token) -> tuple[int, int, str]:
+	# the two values as written and the suits of a class such as "AKs", "T9" or "77"
+	if not 2 <= len(text) <= 3 or text[0].upper() not in shortVals or text[1].upper() not in shortVals or text[2:].lower() not in ["", "s", "o"]:
+		raise ValueError(f"Invalid range {token}")
+	return shortVals.index(text[0].upper()), shortVals.index(text[1].upper()), text[2:].lower()
+
+def parseToken(token, combos):
+	token, _, weight = token.partition(":")
+	weight = float(weight) if weight else 1.0
+
+	if "-" in token:
+		ends = token.split("-")
+		if len(ends) != 2:
+			raise ValueError(f"Invalid range {token}")
+		a, b, suits = parseClass(ends[0], token)
+		c, d, lastSuits = parseClass(ends[1], token)
+		if suits != lastSuits:
+			raise ValueError(f"Invalid range {token}")
+		# pairs step both cards together, other hands keep the high card and step the kicker
+		if a == b and c == d:
+			for x in range(min(a, c), max(a, c) + 1):
+				addClass(combos, x, x, "", weight)
+		elif a == c:
+			for x in range(min(b, d), max(b, d) + 1):
+				addClass(combos, a, x, suits, weight)
+		else:
+			raise ValueError(f"Invalid range {token}")
+		return
+
+	if len(token) == 4 and token[1].lower() in "hdsc":
+		a, b = parseCards(token)
+		combos[(min(a.code, b.code), max(a.code, b.code))] = weight
+		return
+
+	plus = token.endswith("+")
+	high, low, suits = parseClass(token[:-1] if plus else token, token)
+	high, low = max(high, low), min(high, low)
+	if not plus:
+		addClass(combos, high, low, suits, weight)
+	elif high == low:
+		for x in range(high, 13):
+			addClass(combos, x, x, "", weight)
+	else:
+		for x in range(low, high):
+			addClass(combos, high, x, suits, weight)
+
+def parseRange(text) -> Range:
+	# comma separated hands such as "TT+, A5s-A2s, AKo, KQs:0.5, AsKd"
+	combos = {}
+	for token in text.replace(" ", "").split(","):
+		if token:
+			parseToken(token, combos)
+	return Range(combos)
+
+class RangeEquity:
+	def __init__(self, hero: Range, villain: Range, matrix, counts):
+		self.hero = hero
+		self.villain = villain
+		# hero combo by villain combo, counts is how many runouts each pair of combos was scored on
+		self.matrix = matrix
+		self.counts = counts
+
+	def __repr__(self):
+		return f"Range equity {self.equity():.2%}: {len(self.hero)} vs {len(self.villain)} combos"
+
+	def weights(self):
+		heroWeights = np.array(list(self.hero.combos.values()))
+		villainWeights = np.array(list(self.villain.combos.values()))
+		return heroWeights[:, None] * villainWeights[None, :] * (self.counts > 0)
+
+	def equity(self) -> float:
+		weights = self.weights()
+		return float((self.matrix * weights).sum() / weights.sum())
+
+	def comboEquities(self) -> dict[tuple[int, int]: float]:
+		weights = self.weights()
+		totals = weights.sum(axis=1)
+		values = (self.matrix * weights).sum(axis=1) / np.where(totals > 0, totals, 1)
+		return {x: float(y) for x, y in zip(self.hero.combos, values)}
+
+def runouts(board, dead, trials, rng):
+	# every completion of the board when there are few enough, otherwise random ones
+	used = set(x.code for x in board) | set(x.code for x in dead)
+	cards = [x for x in range(52) if x not in used]
+	missing = 5 - len(board)
+	if trials is None:
+		yield from itertools.combinations(cards, missing)
+		return
+	for _ in range(trials):
+		yield rng.sample(cards, missing)
+
+def rangeEquity(hero: Range, villain: Range, board=[], dead=[], trials=None, seed=None) -> RangeEquity:
+	# trials None enumerates every runout from the flop on and samples 10000 preflop
+	if trials is None and len(board) < 3:
+		trials = 10000
+	hero = hero.remove(board + dead)
+	villain = villain.remove(board + dead)
+	heroCombos = list(hero.combos)
+	villainCombos = list(villain.combos)
+	if not heroCombos or not villainCombos:
+		raise ValueError("Both ranges need a combo that is not blocked by the board")
+
+	heroStates = [handState(x) for x in heroCombos]
+	villainStates = [handState(x) for x in villainCombos]
+	heroCards = [(1 << x[0]) | (1 << x[1]) for x in heroCombos]
+	villainCards = [(1 << x[0]) | (1 << x[1]) for x in villainCombos]
+	# pairs of combos that share a card never meet
+	allowed = np.array([[not (x & y) for y in villainCards] for x in heroCards], dtype=bool)
+
+	shares = np.zeros((len(heroCombos), len(villainCombos)))
+	counts = np.zeros((len(heroCombos), len(villainCombos)))
+	boardBits, boardKey = handState([x.code for x in board])
+
+	for runout in runouts(board, dead, trials, random.Random(seed)):
+		# every combo is scored once against the runout and the scores are shared by all of its matchups
+		bits, key = boardBits, boardKey
+		cards = 0
+		for code in runout:
+			bits |= CARD_BITS[code]
+			key *= CARD_PRIMES[code]
+			cards |= 1 << code
+		heroLive = np.array([not (x & cards) for x in heroCards])
+		villainLive = np.array([not (x & cards) for x in villainCards])
+		heroRanks = np.array([rankState(bits | b, key * k) if y else 0 for (b, k), y in zip(heroStates, heroLive)])
+		villainRanks = np.array([rankState(bits | b, key * k) if y else 0 for (b, k), y in zip(villainStates, villainLive)])
+
+		live = allowed & heroLive[:, None] & villainLive[None, :]
+		result = np.sign(heroRanks[:, None] - villainRanks[None, :]) * 0.5 + 0.5
+		shares += np.where(live, result, 0)
+		counts += live
+
+	matrix = shares / np.where(counts > 0, counts, 1)
+	return RangeEquity(hero, villain, matrix, counts)
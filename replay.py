@@ -0,0 +1,127 @@
+from batch import runChunks
+from handhistory import ACTION, HAND, HOLE, SEAT, TABLE, WIN, HandHistoryReader, actionNames
+from v2 import HoldEm
+
+class HandRecord:
+	def __init__(self, number, size, small, big, button, seed, stacks, actions, holes={}, wins={}):
+		self.number = number
+		self.size = size
+		self.small = small
+		self.big = big
+		self.button = button
+		self.seed = seed
+		# stacks are seat: (name, money) and actions are (seat, action, chips put in)
+		self.stacks = stacks
+		self.actions = actions
+		self.holes = holes
+		self.wins = wins
+
+	def __repr__(self):
+		return f"Hand {self.number}: seed {self.seed}: {len(self.actions)} actions"
+
+def parseHand(records, names=[]) -> HandRecord:
+	number = size = small = big = button = seed = 0
+	stacks = {}
+	actions = []
+	holes = {}
+	wins = {}
+	for kind, seat, action, street, amount, extra, *cards in records:
+		if kind == HAND:
+			number, button, seed = amount, seat, extra
+		elif kind == TABLE:
+			size, small, big = seat, amount, extra
+		elif kind == SEAT:
+			stacks[seat] = (names[extra] if extra < len(names) else f"Seat {seat}", amount)
+		elif kind == HOLE:
+			holes[seat] = cards[:2]
+		elif kind == ACTION:
+			actions.append((seat, actionNames[action], amount))
+		elif kind == WIN:
+			wins[seat] = wins.get(seat, 0) + amount
+	return HandRecord(number, size, small, big, button, seed, stacks, actions, holes, wins)
+
+# plays back the logged actions in order, checking each one comes from the seat the engine expects
+class ScriptedAgent:
+	def __init__(self, actions):
+		self.actions = actions
+		self.next = 0
+
+	def __call__(self, state) -> str:
+		if self.next >= len(self.actions):
+			raise ValueError(f"Ran out of actions, {state['name']} is still to act")
+		seat, action, amount = self.actions[self.next]
+		self.next += 1
+		if seat != state["player"].seat:
+			raise ValueError(f"Seat {seat} acted but seat {state['player'].seat} was to act")
+		if action == "bet":
+			return f"bet {amount}"
+		if action == "raise":
+			return f"raise {state['bet'] + amount}"
+		return action
+
+class ReplayResult:
+	def __init__(self, hand: HandRecord, wins, holes, error=None):
+		self.hand = hand
+		self.wins = wins
+		self.holes = holes
+		self.error = error
+
+	def __repr__(self):
+		return f"Replay of hand {self.hand.number}: {'matches' if self.matches() else self.diff()}"
+
+	def diff(self) -> dict:
+		# seat: (logged payout, replayed payout) for every seat that was paid differently
+		if self.error:
+			return {"error": self.error}
+		seats = set(self.hand.wins) | set(self.wins)
+		diff = {x: (self.hand.wins.get(x, 0), self.wins.get(x, 0)) for x in seats if self.hand.wins.get(x, 0) != self.wins.get(x, 0)}
+		cards = {x: (self.hand.holes[x], self.holes.get(x)) for x in self.hand.holes if self.hand.holes[x] != self.holes.get(x)}
+		if cards:
+			diff["cards"] = cards
+		return diff
+
+	def matches(self) -> bool:
+		return not self.diff()
+
+def replayHand(hand: HandRecord, listeners=[]) -> ReplayResult:
+	game = HoldEm(hand.small, hand.big, 0, [], seats=hand.size, listeners=list(listeners))
+	agent = ScriptedAgent(hand.actions)
+	for seat, (name, money) in hand.stacks.items():
+		game.addPlayer(name, money, seat)
+		game.agents[name] = agent
+	game.seats.button = hand.button
+
+	wins = {}
+	holes = {}
+	def collect(event, data):
+		if event == "win":
+			wins[data["player"].seat] = wins.get(data["player"].seat, 0) + data["amount"]
+		elif event == "holeCards":
+			holes.update({x.seat: [y.code for y in cards] for x, cards in data["hands"].items()})
+	game.addListener(collect)
+
+	try:
+		game.playHand(hand.seed)
+	except (ValueError, SyntaxError) as e:
+		return ReplayResult(hand, wins, holes, str(e))
+	if agent.next != len(hand.actions):
+		return ReplayResult(hand, wins, holes, f"{len(hand.actions) - agent.next} logged actions were not used")
+	return ReplayResult(hand, wins, holes)
+
+def replayChunk(job) -> list[ReplayResult]:
+	path, start, stop = job
+	reader = HandHistoryReader(path)
+	results = [replayHand(parseHand(x, reader.names)) for x in reader.hands(start, stop)]
+	reader.close()
+	return results
+
+def replayLog(path, workers=1, chunkSize=1000):
+	# yields a result for every hand in the log, in order, each worker reads its own run of hands from the log
+	reader = HandHistoryReader(path)
+	jobs = [(path, start, stop) for start, stop in reader.handRanges(chunkSize)]
+	reader.close()
+	for results in runChunks(replayChunk, jobs, workers):
+		yield from results
+
+def regressions(path, workers=1, chunkSize=1000) -> list[ReplayResult]:
+	return [x for x in replayLog(path, workers, chunkSize) if not x.matches()]
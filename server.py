@@ -0,0 +1,232 @@
+import argparse
+import asyncio
+import json
+from cards import shortName
+from tables import TableManager
+
+# json lines over tcp, one object per line
+# clients send {"type": "join", "name": ...} then {"type": "action", "action": "raise 20"} whenever they are sent "act"
+# the server sends seated, act, acted (the action that was applied), result after every hand and over when the session ends
+class Client:
+	def __init__(self, reader, writer):
+		self.reader = reader
+		self.writer = writer
+		self.name = None
+		self.pending = None
+		self.connected = True
+		self.received = 0
+		self.sent = 0
+
+	def __repr__(self):
+		return f"Client {self.name}: {'connected' if self.connected else 'gone'}"
+
+	def send(self, message):
+		if not self.connected:
+			return
+		self.writer.write(json.dumps(message, separators=(",", ":")).encode() + b"\n")
+		self.sent += 1
+
+	async def read(self):
+		line = await self.reader.readline()
+		if not line:
+			return None
+		self.received += 1
+		return json.loads(line)
+
+def defaultAction(state) -> str:
+	return "check" if "Check" in state["possible"] else "fold"
+
+def checkAction(action, state) -> bool:
+	# the engine trusts its agents, so anything a client sends is checked against the possible actions first
+	if not isinstance(action, str):
+		return False
+	words = action.lower().split(" ")
+	if words[0].capitalize() not in state["possible"]:
+		return False
+	if words[0] in ["bet", "raise"]:
+		if len(words) != 2 or not words[1].isdigit():
+			return False
+		total = int(words[1]) if words[0] == "raise" else int(words[1]) + state["bet"]
+		return state["currentBet"] < total <= state["money"] + state["bet"]
+	return len(words) == 1
+
+class RemoteAgent:
+	def __init__(self, server, client: Client):
+		self.server = server
+		self.client = client
+
+	async def __call__(self, state) -> str:
+		client = self.client
+		action = None
+		if client.connected:
+			client.pending = asyncio.get_running_loop().create_future()
+			client.send({
+				"type": "act",
+				"hand": [shortName(x) for x in state["hand"]],
+				"community": [shortName(x) for x in state["community"]],
+				"money": state["money"],
+				"bet": state["bet"],
+				"currentBet": state["currentBet"],
+				"toCall": state["toCall"],
+				"pot": state["pot"],
+				"big": state["big"],
+				"possible": state["possible"],
+			})
+			try:
+				await client.writer.drain()
+				action = await asyncio.wait_for(client.pending, self.server.timeout)
+			except asyncio.TimeoutError:
+				self.server.timeouts += 1
+			except ConnectionError:
+				client.connected = False
+			client.pending = None
+
+		valid = checkAction(action, state)
+		if not valid:
+			self.server.invalid += action is not None
+			action = defaultAction(state)
+		client.send({"type": "acted", "action": action, "valid": valid})
+		return action.lower()
+
+class TableServer:
+	def __init__(self, host="127.0.0.1", port=9999, seatsPerTable=6, buy=1000, hands=100, timeout=5.0, levels=[(1, 2)], seed=None, lobbyWait=1.0):
+		self.host = host
+		self.port = port
+		self.seatsPerTable = seatsPerTable
+		self.buy = buy
+		self.hands = hands
+		self.timeout = timeout
+		self.levels = levels
+		self.seed = seed
+		self.lobbyWait = lobbyWait
+		self.lobby = []
+		self.lobbyTimer = None
+		self.clients = {}
+		self.sessions = []
+		self.tables = 0
+		self.timeouts = 0
+		self.invalid = 0
+		self.server = None
+
+	def __repr__(self):
+		return f"Table server {self.host}:{self.port}: {len(self.clients)} clients: {self.tables} tables"
+
+	async def start(self):
+		self.server = await asyncio.start_server(self.connect, self.host, self.port, backlog=4096)
+		self.port = self.server.sockets[0].getsockname()[1]
+
+	async def serve(self):
+		await self.start()
+		async with self.server:
+			await self.server.serve_forever()
+
+	async def close(self):
+		self.server.close()
+		await self.server.wait_closed()
+		if self.lobbyTimer:
+			self.lobbyTimer.cancel()
+			self.lobbyTimer = None
+		# nobody left waiting will get a table now
+		for client in self.lobby:
+			client.send({"type": "over", "standings": []})
+			client.connected = False
+			client.writer.close()
+		self.lobby = []
+		for task in self.sessions:
+			task.cancel()
+
+	async def connect(self, reader, writer):
+		client = Client(reader, writer)
+		try:
+			while True:
+				message = await client.read()
+				if message is None:
+					break
+				if not isinstance(message, dict):
+					# valid json that is not an object is ignored like any other message the server does not know
+					continue
+				if message.get("type") == "join" and client.name is None:
+					self.join(client, str(message.get("name", "")))
+				elif message.get("type") == "action" and client.pending and not client.pending.done():
+					client.pending.set_result(message.get("action"))
+				elif message.get("type") == "stats":
+					client.send({"type": "stats"} | self.report())
+		except (ConnectionError, json.JSONDecodeError):
+			pass
+		finally:
+			# a player who leaves mid session folds out of every hand until it ends
+			client.connected = False
+			if client.pending and not client.pending.done():
+				client.pending.set_result(None)
+			if client in self.lobby:
+				self.lobby.remove(client)
+			self.clients.pop(client.name, None)
+			writer.close()
+
+	def join(self, client: Client, name):
+		base = name or "Player"
+		number = len(self.clients) + self.tables * self.seatsPerTable
+		while not name or name in self.clients:
+			name = f"{base}#{number}"
+			number += 1
+		client.name = name
+		self.clients[name] = client
+		self.lobby.append(client)
+		if len(self.lobby) >= self.seatsPerTable:
+			self.seat(self.seatsPerTable)
+		else:
+			self.waitLobby()
+
+	def seat(self, count):
+		if self.lobbyTimer:
+			self.lobbyTimer.cancel()
+			self.lobbyTimer = None
+		seated = self.lobby[:count]
+		self.lobby = self.lobby[count:]
+		self.sessions.append(asyncio.create_task(self.session(seated)))
+		self.waitLobby()
+
+	def waitLobby(self):
+		# clients that cannot fill a table get a short handed one once the first of them has waited lobbyWait seconds
+		if self.lobby and self.lobbyTimer is None:
+			self.lobbyTimer = asyncio.get_running_loop().call_later(self.lobbyWait, self.seatLobby)
+
+	def seatLobby(self):
+		self.lobbyTimer = None
+		if self.lobby:
+			self.seat(min(len(self.lobby), self.seatsPerTable))
+
+	async def session(self, seated):
+		# each table is its own cash game, busted players buy back in until the hands run out
+		number = self.tables
+		self.tables += 1
+		agents = {x.name: RemoteAgent(self, x) for x in seated}
+		manager = TableManager([x.name for x in seated], self.seatsPerTable, self.buy, self.levels, mode="cash", agentFactory=agents.get, seed=f"{self.seed}:{number}")
+		for client in seated:
+			client.send({"type": "seated", "table": number, "players": [x.name for x in seated]})
+
+		def result(data):
+			for client in seated:
+				client.send({"type": "result", "hand": data["hand"], "payout": data["payouts"][client.name]})
+		manager.addListener(result)
+		report = await manager.run(self.hands)
+		for client in seated:
+			client.send({"type": "over", "standings": report["standings"]})
+			if client.connected:
+				await client.writer.drain()
+				client.writer.close()
+
+	def report(self) -> dict:
+		return {"clients": len(self.clients), "waiting": len(self.lobby), "tables": self.tables, "timeouts": self.timeouts, "invalid": self.invalid}
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(description="Host HoldEm tables for bots over tcp")
+	parser.add_argument("--host", default="127.0.0.1")
+	parser.add_argument("--port", type=int, default=9999)
+	parser.add_argument("--seats", type=int, default=6)
+	parser.add_argument("--buy", type=int, default=1000)
+	parser.add_argument("--hands", type=int, default=100, help="Hands each table plays before its session ends")
+	parser.add_argument("--timeout", type=float, default=5.0, help="Seconds a player has to act before they check or fold")
+	parser.add_argument("--wait", type=float, default=1.0, help="Seconds clients wait in the lobby before a short handed table starts")
+	args = parser.parse_args()
+	asyncio.run(TableServer(args.host, args.port, args.seats, args.buy, args.hands, args.timeout, lobbyWait=args.wait).serve())
@@ -0,0 +1,201 @@
+from array import array
+from batch import runChunks
+from handhistory import ACTION, BLIND, BOARD, END, HAND, SEAT, WIN, HandHistoryReader, actionNames
+
+# counters kept for every player, one row of the flat array each
+HANDS, VPIP, PFR, THREE_BET_CHANCES, THREE_BETS, AGGRESSIVE, CALLS, SAW_FLOP, SHOWDOWNS, SHOWDOWN_WINS = range(10)
+FIELDS = 10
+
+# a listener for HoldEm that can also be fed hand history records, the counters are updated as each hand finishes
+class StatsAggregator:
+	def __init__(self):
+		self.names = []
+		self.index = {}
+		self.counts = array("q")
+		self.hand = None
+
+	def __repr__(self):
+		return f"Stats: {len(self.names)} players: {sum(self.counts[HANDS::FIELDS])} player hands"
+
+	def __getstate__(self):
+		return {"names": self.names, "counts": self.counts}
+
+	def __setstate__(self, state):
+		self.names = state["names"]
+		self.index = {x: i for i, x in enumerate(self.names)}
+		self.counts = state["counts"]
+		self.hand = None
+
+	def row(self, name) -> int:
+		if name not in self.index:
+			self.index[name] = len(self.names)
+			self.names.append(name)
+			self.counts.extend([0] * FIELDS)
+		return self.index[name] * FIELDS
+
+	def add(self, name, field):
+		self.counts[self.row(name) + field] += 1
+
+	def start(self, names):
+		self.hand = {
+			"dealt": list(names),
+			"bets": {x: 0 for x in names},
+			"contributions": {x: 0 for x in names},
+			"wins": {},
+			"folded": set(),
+			"counted": set(),
+			"bet": 0,
+			"raises": 0,
+			"street": 0,
+		}
+
+	def blind(self, name, amount):
+		hand = self.hand
+		hand["bets"][name] += amount
+		hand["contributions"][name] += amount
+		hand["bet"] = max(hand["bet"], hand["bets"][name])
+
+	def action(self, name, action, amount):
+		hand = self.hand
+		total = hand["bets"][name] + amount
+		aggressive = total > hand["bet"]
+		called = amount > 0 and not aggressive
+		if hand["street"] == 0:
+			# the first time a player acts facing a single raise they could have three bet
+			if hand["raises"] == 1 and (name, THREE_BET_CHANCES) not in hand["counted"]:
+				hand["counted"].add((name, THREE_BET_CHANCES))
+				self.add(name, THREE_BET_CHANCES)
+				if aggressive:
+					self.add(name, THREE_BETS)
+			for field, happened in [(VPIP, aggressive or called), (PFR, aggressive)]:
+				if happened and (name, field) not in hand["counted"]:
+					hand["counted"].add((name, field))
+					self.add(name, field)
+			hand["raises"] += aggressive
+		elif aggressive:
+			self.add(name, AGGRESSIVE)
+		elif called:
+			self.add(name, CALLS)
+
+		if action == "fold":
+			hand["folded"].add(name)
+		hand["bets"][name] = total
+		hand["contributions"][name] += amount
+		hand["bet"] = max(hand["bet"], total)
+
+	def street(self):
+		hand = self.hand
+		if hand["street"] == 0:
+			for name in hand["dealt"]:
+				if name not in hand["folded"]:
+					self.add(name, SAW_FLOP)
+		hand["street"] += 1
+		hand["bets"] = {x: 0 for x in hand["dealt"]}
+		hand["bet"] = 0
+
+	def win(self, name, amount):
+		self.hand["wins"][name] = self.hand["wins"].get(name, 0) + amount
+
+	def finish(self):
+		hand = self.hand
+		for name in hand["dealt"]:
+			self.add(name, HANDS)
+		live = [x for x in hand["dealt"] if x not in hand["folded"]]
+		if len(live) > 1:
+			contributions = hand["contributions"]
+			for name in live:
+				self.add(name, SHOWDOWNS)
+				# chips above what anyone else put in come back uncalled, they are not won at showdown
+				uncalled = max(0, contributions[name] - max(contributions[x] for x in live if x != name))
+				if hand["wins"].get(name, 0) > uncalled:
+					self.add(name, SHOWDOWN_WINS)
+		self.hand = None
+
+	def __call__(self, event, data):
+		if event == "newRound":
+			self.start([x.name for x in data["players"] if x.state == 2])
+		elif self.hand is None:
+			return
+		elif event == "blind":
+			self.blind(data["player"].name, data["amount"])
+		elif event == "action":
+			self.action(data["player"].name, data["action"], data["amount"])
+		elif event == "board":
+			self.street()
+		elif event == "win":
+			self.win(data["player"].name, data["amount"])
+		elif event == "handOver":
+			self.finish()
+
+	def addRecords(self, records, names=[]):
+		# hand history records in order, any number of hands
+		seats = {}
+		street = 0
+		for kind, seat, action, streetCode, amount, extra, *cards in records:
+			if kind == HAND:
+				seats = {}
+				street = 0
+				self.start([])
+			elif self.hand is None:
+				continue
+			elif kind == SEAT:
+				seats[seat] = names[extra] if extra < len(names) else f"Player {extra}"
+				self.hand["dealt"].append(seats[seat])
+				self.hand["bets"][seats[seat]] = 0
+				self.hand["contributions"][seats[seat]] = 0
+			elif kind == BLIND:
+				self.blind(seats[seat], amount)
+			elif kind == ACTION:
+				self.action(seats[seat], actionNames[action], amount)
+			elif kind == BOARD and streetCode != street:
+				street = streetCode
+				self.street()
+			elif kind == WIN:
+				self.win(seats[seat], amount)
+			elif kind == END:
+				self.finish()
+
+	def merge(self, other: "StatsAggregator"):
+		for name in other.names:
+			row = self.row(name)
+			theirs = other.index[name] * FIELDS
+			for field in range(FIELDS):
+				self.counts[row + field] += other.counts[theirs + field]
+
+	def counters(self, name) -> list[int]:
+		row = self.index[name] * FIELDS
+		return list(self.counts[row:row + FIELDS])
+
+	def stats(self, name) -> dict:
+		counts = self.counters(name)
+		ratio = lambda x, y: counts[x] / counts[y] if counts[y] else 0.0
+		return {
+			"hands": counts[HANDS],
+			"vpip": ratio(VPIP, HANDS),
+			"pfr": ratio(PFR, HANDS),
+			"threeBet": ratio(THREE_BETS, THREE_BET_CHANCES),
+			"aggression": ratio(AGGRESSIVE, CALLS),
+			"wtsd": ratio(SHOWDOWNS, SAW_FLOP),
+			"wsd": ratio(SHOWDOWN_WINS, SHOWDOWNS),
+		}
+
+	def table(self) -> dict[str: dict]:
+		return {x: self.stats(x) for x in self.names}
+
+def statsChunk(job) -> StatsAggregator:
+	path, start, stop = job
+	reader = HandHistoryReader(path)
+	aggregator = StatsAggregator()
+	aggregator.addRecords(reader.records(start, stop), reader.names)
+	reader.close()
+	return aggregator
+
+def logStats(path, workers=1, chunkSize=1000) -> StatsAggregator:
+	# each worker maps the log itself and counts a run of hands, only the record ranges and the partial counts are sent between processes
+	reader = HandHistoryReader(path)
+	jobs = [(path, start, stop) for start, stop in reader.handRanges(chunkSize)]
+	reader.close()
+	aggregator = StatsAggregator()
+	for partial in runChunks(statsChunk, jobs, workers):
+		aggregator.merge(partial)
+	return aggregator
@@ -0,0 +1,199 @@
+import asyncio
+import inspect
+import math
+import random
+import time
+from agents import RandomAgent
+from v2 import HoldEm
+
+class Table:
+	def __init__(self, number, game: HoldEm):
+		self.number = number
+		self.game = game
+		self.hands = 0
+
+	def __repr__(self):
+		return f"Table {self.number}: {str([x.name for x in self.players()])[1:-1]}"
+
+	def players(self):
+		return self.game.seats.createList()
+
+class DecisionStats:
+	def __init__(self, rng, samples=10000):
+		self.rng = rng
+		self.samples = samples
+		self.count = 0
+		self.total = 0.0
+		self.longest = 0.0
+		self.reservoir = []
+
+	def record(self, seconds):
+		self.count += 1
+		self.total += seconds
+		self.longest = max(self.longest, seconds)
+		# keep a uniform sample of every latency for the percentiles
+		if len(self.reservoir) < self.samples:
+			self.reservoir.append(seconds)
+		else:
+			i = self.rng.randrange(self.count)
+			if i < self.samples:
+				self.reservoir[i] = seconds
+
+	def percentile(self, p):
+		if not self.reservoir:
+			return 0.0
+		ordered = sorted(self.reservoir)
+		return ordered[min(int(p / 100 * len(ordered)), len(ordered) - 1)]
+
+# mode is "tournament" where busted players are knocked out, or "cash" where they buy back in
+class TableManager:
+	def __init__(self, players, seatsPerTable=9, buy=1000, levels=[(1, 2)], handsPerLevel=50, mode="tournament", agentFactory=None, seed=None):
+		self.rng = random.Random(seed)
+		self.seed = seed
+		self.seatsPerTable = seatsPerTable
+		self.buy = buy
+		self.levels = levels
+		self.handsPerLevel = handsPerLevel
+		self.mode = mode
+		self.agentFactory = agentFactory if agentFactory else lambda name: RandomAgent(random.Random(f"{seed}:{name}"))
+		self.agents = {x: self.agentFactory(x) for x in players}
+		self.listeners = []
+		self.rounds = 0
+		self.hands = 0
+		self.rebuys = 0
+		self.eliminated = []
+		self.decisions = DecisionStats(self.rng)
+		self.cpuTime = 0.0
+		self.wallTime = 0.0
+
+		# deal players out round robin so the tables start balanced
+		names = list(players)
+		self.rng.shuffle(names)
+		count = math.ceil(len(names) / seatsPerTable)
+		self.tables = []
+		for i in range(count):
+			seated = names[i::count]
+			game = HoldEm(levels[0][0], levels[0][1], buy, seated, rng=random.Random(f"{seed}:table{i}"), agents={x: self.agents[x] for x in seated}, seats=seatsPerTable)
+			self.tables.append(Table(i, game))
+
+	def addListener(self, listener):
+		self.listeners.append(listener)
+
+	def level(self):
+		return self.levels[min(self.rounds // self.handsPerLevel, len(self.levels) - 1)]
+
+	def playerCount(self):
+		return sum([len(x.players()) for x in self.tables])
+
+	async def playHand(self, table: Table):
+		game = table.game
+		if not game.canPlay():
+			return
+		before = {x.name: x.money for x in table.players()}
+		start = time.perf_counter()
+
+		steps = game.handSteps()
+		action = None
+		while True:
+			try:
+				player, state = steps.send(action)
+			except StopIteration:
+				break
+			decisionStart = time.perf_counter()
+			action = game.agents[player.name](state)
+			if inspect.isawaitable(action):
+				action = await action
+			self.decisions.record(time.perf_counter() - decisionStart)
+
+		table.hands += 1
+		self.hands += 1
+		result = {
+			"table": table.number,
+			"hand": table.hands,
+			"level": (game.small, game.big),
+			"payouts": {x.name: x.money - before[x.name] for x in table.players()},
+			"seconds": time.perf_counter() - start,
+		}
+		for listener in self.listeners:
+			listener(result)
+
+	def movePlayer(self, source: Table, target: Table, player):
+		source.game.removePlayer(player.seat)
+		del source.game.agents[player.name]
+		target.game.addPlayer(player.name, player.money)
+		target.game.agents[player.name] = self.agents[player.name]
+
+	def handleBusts(self):
+		for table in self.tables:
+			for player in table.players():
+				if player.money:
+					continue
+				if self.mode == "cash":
+					player.money = self.buy
+					self.rebuys += 1
+				else:
+					table.game.removePlayer(player.seat)
+					del table.game.agents[player.name]
+					self.eliminated.append(player.name)
+
+	def balance(self):
+		self.tables = [x for x in self.tables if x.players()]
+
+		# break the smallest table while the players fit on one fewer
+		while len(self.tables) > 1 and len(self.tables) > math.ceil(self.playerCount() / self.seatsPerTable):
+			self.tables.sort(key=lambda x: len(x.players()))
+			broken = self.tables.pop(0)
+			for player in broken.players():
+				target = min(self.tables, key=lambda x: len(x.players()))
+				self.movePlayer(broken, target, player)
+
+		# then even out the rest so no table has two more players than another
+		while len(self.tables) > 1:
+			self.tables.sort(key=lambda x: len(x.players()))
+			smallest, biggest = self.tables[0], self.tables[-1]
+			if len(biggest.players()) - len(smallest.players()) <= 1:
+				break
+			# move the player who would be the next big blind so nobody skips the blinds twice
+			seats = biggest.game.seats
+			player = seats[seats.nextSeat(seats.nextSeat(seats.button, seats.occupied), seats.occupied)]
+			self.movePlayer(biggest, smallest, player)
+
+	def finished(self):
+		return self.mode == "tournament" and self.playerCount() <= 1
+
+	async def run(self, rounds=None) -> dict:
+		# every table plays a hand concurrently, then busts, blinds and balancing are handled between hands
+		wallStart = time.perf_counter()
+		cpuStart = time.process_time()
+		while not self.finished() and (rounds is None or self.rounds < rounds):
+			small, big = self.level()
+			for table in self.tables:
+				table.game.small = small
+				table.game.big = big
+			await asyncio.gather(*[self.playHand(x) for x in self.tables])
+			self.rounds += 1
+			self.handleBusts()
+			self.balance()
+		self.wallTime += time.perf_counter() - wallStart
+		self.cpuTime += time.process_time() - cpuStart
+		return self.report()
+
+	def runSync(self, rounds=None) -> dict:
+		return asyncio.run(self.run(rounds))
+
+	def report(self) -> dict:
+		return {
+			"tables": len(self.tables),
+			"players": self.playerCount(),
+			"rounds": self.rounds,
+			"hands": self.hands,
+			"rebuys": self.rebuys,
+			"handsPerSecond": self.hands / self.wallTime if self.wallTime else 0.0,
+			"handsPerCpuSecond": self.hands / self.cpuTime if self.cpuTime else 0.0,
+			"decisions": self.decisions.count,
+			"decisionMean": self.decisions.total / self.decisions.count if self.decisions.count else 0.0,
+			"decisionP50": self.decisions.percentile(50),
+			"decisionP99": self.decisions.percentile(99),
+			"decisionMax": self.decisions.longest,
+			"standings": [x.name for x in sorted([p for t in self.tables for p in t.players()], key=lambda x: -x.money)] + self.eliminated[::-1],
+		}
@@ -0,0 +1,33 @@
+import itertools
+import random
+from canonical import canonicalIndex, canonicalKey, fromIndex, handIndexer
+
+def test_indexSizes():
+	# hole cards then a board of each size, the same counts as suit isomorphic hand indexers elsewhere
+	sizes = {0: 169, 3: 1286792, 4: 13960050, 5: 123156254}
+	for board, size in sizes.items():
+		assert len(handIndexer((2, board))) == size
+
+def test_indexAllSmallSituations():
+	# every deal of one card then two is numbered densely, and two deals share a number only when they share a canonical key
+	indexer = handIndexer((1, 2))
+	keys = {}
+	for first in range(52):
+		for second in itertools.combinations([x for x in range(52) if x != first], 2):
+			groups = [[first], list(second)]
+			assert keys.setdefault(indexer.index(groups), canonicalKey(groups)) == canonicalKey(groups)
+	assert sorted(keys) == list(range(len(indexer)))
+	assert all(indexer.index(indexer.groups(x)) == x for x in range(len(indexer)))
+
+def test_indexRoundTrip():
+	rng = random.Random(0)
+	for board in [3, 4, 5]:
+		size = len(handIndexer((2, board)))
+		for _ in range(2000):
+			cards = rng.sample(range(52), 2 + board)
+			groups = [cards[:2], cards[2:]]
+			index = canonicalIndex(groups)
+			assert 0 <= index < size
+			assert canonicalKey(fromIndex(index, (2, board))) == canonicalKey(groups)
+			other = rng.randrange(size)
+			assert canonicalIndex(fromIndex(other, (2, board))) == other
@@ -0,0 +1,36 @@
+import random
+from agents import RandomAgent
+from gamestate import applyAction, dealStreet, snapshot
+from v2 import HoldEm
+
+def test_applyActionMirrorsEngine():
+	# every decision's snapshot is the previous snapshot with the previous action applied, and any new board cards dealt
+	rng = random.Random(2)
+	names = ["A", "B", "C", "D", "E", "F"]
+	game = HoldEm(1, 2, 200, names, rng=rng)
+	agent = RandomAgent(rng)
+	decisions = 0
+	for _ in range(300):
+		if not game.canPlay():
+			for player in game.seats.createList():
+				player.money = 200
+		steps = game.handSteps()
+		predicted = None
+		action = None
+		while True:
+			try:
+				player, state = steps.send(action)
+			except StopIteration:
+				break
+			current = snapshot(game)
+			if predicted is not None:
+				if current.board != predicted.board:
+					assert predicted.toAct == -1
+					predicted = dealStreet(predicted, current.board[len(predicted.board):])
+				assert current == predicted
+			action = agent(state)
+			predicted = applyAction(current, action)
+			decisions += 1
+		if predicted is not None:
+			assert predicted.toAct == -1
+	assert decisions > 1000
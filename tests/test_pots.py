@@ -0,0 +1,49 @@
+import random
+from agents import RandomAgent
+from v2 import HoldEm, resolvePots
+
+def naivePots(contributions, live) -> list[tuple[int, set]]:
+	# one layer per distinct live level, everyone pays up to the level or what they put in, whichever is less
+	levels = sorted(set(contributions[x] for x in live))
+	pots = []
+	previous = 0
+	for level in levels:
+		amount = sum(min(x, level) - previous for x in contributions.values() if x > previous)
+		pots.append((amount, set(x for x in live if contributions[x] >= level)))
+		previous = level
+	extra = sum(x - previous for x in contributions.values() if x > previous)
+	if extra:
+		pots[-1] = (pots[-1][0] + extra, pots[-1][1])
+	return pots
+
+def test_resolvePotsRandom():
+	rng = random.Random(0)
+	for _ in range(2000):
+		seats = rng.randint(2, 9)
+		contributions = {x: rng.choice([0, rng.randint(1, 50), rng.randint(1, 500)]) for x in range(seats)}
+		live = [x for x in range(seats) if contributions[x] and rng.random() < 0.7]
+		if not live:
+			# someone always has to be left in, and an empty pot is never resolved
+			if not any(contributions.values()):
+				continue
+			live = [max(contributions, key=contributions.get)]
+		pots = resolvePots(contributions, live)
+		assert sum(x.amount for x in pots) == sum(contributions.values())
+		assert [(x.amount, set(x.players)) for x in pots] == naivePots(contributions, live)
+
+def test_runConservesChips():
+	# random agents bust each other quickly, so the stacks are reset whenever the table can no longer play
+	rng = random.Random(1)
+	names = ["A", "B", "C", "D", "E", "F"]
+	game = HoldEm(1, 2, 200, names, rng=rng)
+	for name in names:
+		game.agents[name] = RandomAgent(rng)
+	totals = []
+	game.listeners.append(lambda event, data: totals.append(sum(x.money for x in data["players"])) if event == "handOver" else None)
+	played = 0
+	while played < 500:
+		for player in game.seats.createList():
+			player.money = 200
+		played += game.run(500 - played)
+	assert len(totals) == played
+	assert all(x == 200 * len(names) for x in totals)
@@ -0,0 +1,11 @@
+import pytest
+from ranges import parseRange
+
+def test_parseRange():
+	assert len(parseRange("TT+, A5s-A2s, AKo, KQs:0.5, AsKd")) == 62
+	assert len(parseRange("22-55")) == 24
+
+@pytest.mark.parametrize("text", ["AKs-", "-AKs", "A-K", "AKs-A", "AKs-AQs-AJs", "XKs-AQs", "AKs-AQo", "AKx", "ZZ", "AK++"])
+def test_parseRangeInvalid(text):
+	with pytest.raises(ValueError, match="Invalid range"):
+		parseRange(text)
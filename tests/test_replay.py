@@ -0,0 +1,26 @@
+import random
+from agents import RandomAgent
+from handhistory import HandHistoryReader, HandHistoryWriter
+from replay import regressions
+from v2 import HoldEm
+
+def test_loggedHandsReplay(tmp_path):
+	# seeded random hands are logged, then every hand is played back from the log and must be paid the same way
+	path = str(tmp_path / "hands.log")
+	rng = random.Random(3)
+	names = ["A", "B", "C", "D", "E", "F"]
+	game = HoldEm(1, 2, 200, names, rng=rng)
+	for name in names:
+		game.agents[name] = RandomAgent(rng)
+	writer = HandHistoryWriter(path, game)
+	game.addListener(writer)
+	for _ in range(500):
+		if not game.canPlay():
+			for player in game.seats.createList():
+				player.money = 200
+		game.playHand()
+	writer.close()
+	reader = HandHistoryReader(path)
+	assert reader.handCount() == 500
+	reader.close()
+	assert regressions(path, chunkSize=100) == []
@@ -0,0 +1,8 @@
+from evaluator import rankCodes
+from vectorized import randomHands, rankBatch
+
+def test_rankBatchMatchesScalar():
+	for cards in [5, 6, 7]:
+		hands = randomHands(50000, cards, seed=cards)
+		ranks = rankBatch(hands)
+		assert [int(x) for x in ranks] == [rankCodes([int(y) for y in x]) for x in hands]
@@ -1,35 +1,9 @@
 import random
 from collections import Counter
-
-class Card:
-	def __init__(self, suit, value):
-		self.mapSuits = {0: 'Hearts', 1: 'Diamonds', 2: 'Spades', 3: 'Clubs'}
-		self.mapVals = {x: str(x + 2) for x in range(9)} | {9: 'Jack', 10: 'Queen', 11: 'King', 12: 'Ace'}
-
-		self.suit = suit
-		self.value = value
-	
-	def __repr__(self):
-		return f"{self.mapVals[self.value]} of {self.mapSuits[self.suit]}"
-
-	def __eq__(self, other) : 
-		return self.__dict__ == other.__dict__
-
-class Deck:
-	def __init__(self):
-		self.suits = [x for x in range(4)]
-		self.vals = [x for x in range(13)]
-		self.cards = [Card(x, y) for x in self.suits for y in self.vals]
-	
-	def __repr__(self):
-		return str(self.cards)[1:-1]
-	
-	def shuffle(self):
-		random.shuffle(self.cards)
-	
-	def deal(self, number=1):
-		cards, self.cards = self.cards[:number], self.cards[number:]
-		return cards
+from cards import Card, Deck
+from agents import consoleAgent
+from equity import exactEquity, monteCarlo
+from evaluator import HandTracker, handState, rankState
 
 # player state in {0: Folded and out of hand, 1: Currently at the table bet, 2: Needs to call a bet on the table, 3: All-in and cannot make any other actions}
 
@@ -37,208 +11,227 @@ class Player:
 	def __init__(self, name, money):
 		self.name = name
 		self.money = money
-		self.state = 1
-		self.latestPot = 0
 		self.stateMapping = {0: "Folded", 1: "At table bet", 2: "Needs to call", 3: "All-in"}
+		self.seat = None
+		self.seats = None
+		self.sittingOut = False
+		self._state = 1
 	
 	def __repr__(self):
 		return f"Player {self.name}: £{self.money}: {self.stateMapping[self.state]}"
 
-class Node:
-	def __init__(self, player: Player):
-		self.player = player
-		self.next = None
-
-class PlayerLinkedList:
-	def __init__(self):
-		self.head = None
-	
-	def append(self, player: Player):
-		new = Node(player)
-		if not self.head:
-			self.head = new
-			new.next = new
-		else:
-			this = self.head
-			while this.next != self.head:
-				this = this.next
-			this.next = new
-			new.next = self.head
-	
-	def traverse(self):
-		this = self.head
-		while True:
-			print(f"{this.player} : ", end="")
-			this = this.next
-			if this == self.head:
-				break
-		print(this.player)
-	
-	def changeHead(self, player: Player):
-		this = self.head
-		while this.player != player:
-			this = this.next
-		self.head = this
-	
-	def delete(self, player: Player):
-		if self.head.player == player:
-			this = self.head
-			while this.next != self.head:
-				this = this.next
-			this.next = self.head.next
-			self.head = self.head.next
-			return
-		
-		this = self.head
-		while this.next.player != player:
-			this = this.next
-		this.next = this.next.next
-	
-	def createList(self, states=[0,1,2,3]) -> list[Player]:
-		this = self.head
-		l = []
-		while True:
-			if this.player.state in states:
-				l.append(this.player)
-			this = this.next
-			if this == self.head:
-				break
-		return l
-	
-	def findNext(self, player: Player) -> Player:
-		this = self.head
-		while this.next.player != player:
-			this = this.ext
-		return this.next.next.player
+	# the seats keep a bitmask of players in each state so it is updated whenever the state changes
+	@property
+	def state(self):
+		return self._state
+
+	@state.setter
+	def state(self, state):
+		if self.seats:
+			self.seats.setState(self.seat, self._state, state)
+		self._state = state
+
+class SeatRing:
+	def __init__(self, size):
+		self.seats = [None for _ in range(size)]
+		self.size = size
+		self.button = 0
+		self.occupied = 0
+		self.masks = [0, 0, 0, 0]
+
+	def __getitem__(self, seat) -> Player:
+		return self.seats[seat]
+
+	def sit(self, player: Player, seat):
+		if self.seats[seat]:
+			raise ValueError(f"Seat {seat} is taken by {self.seats[seat].name}")
+		self.seats[seat] = player
+		player.seat = seat
+		player.seats = self
+		self.occupied |= 1 << seat
+		self.masks[player.state] |= 1 << seat
+
+	def leave(self, seat) -> Player:
+		player = self.seats[seat]
+		self.occupied &= ~(1 << seat)
+		self.masks[player.state] &= ~(1 << seat)
+		self.seats[seat] = None
+		player.seat = None
+		player.seats = None
+		return player
+
+	def emptySeats(self) -> list[int]:
+		return [x for x in range(self.size) if not self.seats[x]]
+
+	def setState(self, seat, old, new):
+		self.masks[old] &= ~(1 << seat)
+		self.masks[new] |= 1 << seat
+
+	def stateMask(self, states) -> int:
+		mask = 0
+		for state in states:
+			mask |= self.masks[state]
+		return mask
+
+	def count(self, states) -> int:
+		return self.stateMask(states).bit_count()
+
+	def nextSeat(self, seat, mask) -> int:
+		# first seat in the mask after this one going round the table, -1 if there is none
+		after = mask >> (seat + 1) << (seat + 1)
+		if after:
+			return (after & -after).bit_length() - 1
+		if mask:
+			return (mask & -mask).bit_length() - 1
+		return -1
+
+	def createList(self, states=[0,1,2,3], start=None) -> list[Player]:
+		# players in the given states going round the table from start, the button by default
+		mask = self.stateMask(states)
+		start = self.button if start is None else start % self.size
+		return [self.seats[x % self.size] for x in range(start, start + self.size) if mask >> (x % self.size) & 1]
+
+	def moveButton(self):
+		self.button = self.nextSeat(self.button, self.occupied)
 
 class Pot:
-	def __init__(self):
-		self.lastTotal = 0
-		self.bet = 0
-		self.bets = {}
-	
-	def placeBet(self, player, bet):
-		total = self.bets.get(player, 0) + bet
-		self.bets[player] = total
-		if total > self.bet:
-			self.bet = total
-	
-	def newBettingRound(self):
-		self.bet = 0
-		for player, bet in self.bets.items():
-			self.lastTotal += bet
-			self.bets[player] = 0
-	
-	def foldPlayer(self, player):
-		if player in self.bets:
-			self.lastTotal += self.bets.pop(player)
-	
-	def createSidePot(self, newBet):
-		if newBet <= self.bet:
-			return None
-
-		sidePot = Pot()
-		self.bet = newBet
-
-		for player, theirBet in self.bets.items():
-			if theirBet > self.bet:
-				diff = theirBet - self.bet
-				sidePot.playerBet(player, diff)
-				self.bets[player] -= diff
-		
-		return sidePot
+	def __init__(self, amount, players):
+		self.amount = amount
+		self.players = players
+
+	def __repr__(self):
+		return f"Pot £{self.amount}: {str([x.name for x in self.players])[1:-1]}"
+
+def resolvePots(contributions: dict[Player: int], live: list[Player]) -> list[Pot]:
+	# one pass over the contributions in order, each live player's total closes a layer of the pot
+	entries = sorted(contributions.items(), key=lambda x: x[1])
+	live = set(live)
+	pots = []
+	previous = 0
+	i = 0
+	for j in range(len(entries)):
+		player, level = entries[j]
+		if player not in live or level == previous:
+			continue
+
+		amount = (len(entries) - i) * (level - previous)
+		while i < len(entries) and entries[i][1] < level:
+			amount -= level - entries[i][1]
+			i += 1
+		pots.append(Pot(amount, [x for x, y in entries[i:] if x in live]))
+		previous = level
+
+	# anything put in above the last live player by folded players goes to the last pot
+	extra = sum(x[1] - previous for x in entries if x[1] > previous)
+	if extra:
+		if pots:
+			pots[-1].amount += extra
+		else:
+			pots.append(Pot(extra, list(live)))
+	return pots
 
 class HoldEm:
-	def __init__(self, small, big, buy, players):
-		self.players = PlayerLinkedList()
-		playerList = []
-		for p in players:
-			new = Player(p, buy)
-			self.players.append(new)
-			playerList.append(new)
-		self.button = random.choice(playerList)
-		self.players.changeHead(self.button)
-		self.button = self.players.head
+	def __init__(self, small, big, buy, players, seed=None, rng=None, agents=None, listeners=None, seats=None):
+		self.rng = rng if rng else random.Random(seed)
+		self.seats = SeatRing(seats if seats else len(players))
+		for i, p in enumerate(players):
+			self.seats.sit(Player(p, buy), i)
+		self.seats.button = self.rng.randrange(len(players)) if players else 0
 		self.small = small
 		self.big = big
-		self.deck = Deck()
+		# every hand is dealt from its own seed so it can be replayed
+		self.deck = Deck(rng=random.Random())
+		self.handSeed = None
 		self.possible = ["Fold", "Check", "Call", "Bet", "Raise", "Jam"]
+		# agents decide for players by name, anyone without one is asked at the console
+		self.agents = agents if agents else {}
+		self.listeners = listeners if listeners else []
+		# set to emit an allIn event with equity and run it twice results when the board is run out
+		self.reportAllIn = False
 	
-	def handleSidePot(self, pot: Pot, bet):
-		sidePot = pot.createSidePot(bet)
+	def addPlayer(self, name, money, seat=None) -> Player:
+		player = Player(name, money)
+		self.seats.sit(player, seat if seat is not None else self.seats.emptySeats()[0])
+		player.state = 0
+		return player
 
-		if sidePot:
-			self.pots.insert(self.pots.index(pot) + 1, sidePot)
+	def removePlayer(self, seat) -> Player:
+		return self.seats.leave(seat)
 
-			for player in self.players.createList([1, 2]):
-				toCall = pot.bet - pot.bets.get(player, 0)
-				if player.money > toCall:
-					player.latestPot += 1
+	def sitOut(self, player: Player):
+		player.sittingOut = True
 
-	def handleBet(self, player: Player, bet):
-		pot = player.latestPot
+	def sitIn(self, player: Player):
+		player.sittingOut = False
+
+	def addListener(self, listener):
+		self.listeners.append(listener)
+
+	def emit(self, event, **data):
+		for listener in self.listeners:
+			listener(event, data)
+	
+	def handleSidePot(self):
+		# rebuild every main and side pot from what each player has put in this hand
+		self.pots = resolvePots(self.contributions, self.seats.createList([1, 2, 3]))
 
+	def handleBet(self, player: Player, bet):
 		if bet >= player.money:
 			bet = player.money
 			player.state = 3
 		else:
 			player.state = 1
 
-		moneyToTake = bet
-		
-		# place bets in side pots if applicable
-		for i in range(pot):
-			toCall = self.pots[i].bet - self.pots[i].bets.get(player, 0)
-			bet -= toCall
-			self.pots[i].placeBet(player, toCall)
-		
+		player.money -= bet
+		self.contributions[player] = self.contributions.get(player, 0) + bet
+		total = self.bets.get(player, 0) + bet
+		self.bets[player] = total
+
 		# if bet is raise then make all other players go again
-		if bet > self.pots[pot].bet:
-			self.pots[pot].placeBet(player, bet)
-			for p in self.pots[pot].bets.keys():
-				if (self.pots[pot].bet - self.pots[pot].bets.get(p, 0)) > 0 and p.state == 1:
+		if total > self.bet:
+			self.bet = total
+			for p in self.seats.createList([1]):
+				if self.bets.get(p, 0) < self.bet:
 					p.state = 2
-		else:
-			self.pots[pot].placeBet(player, bet)
-
-		# split pot if player is all-in
-		allIns = [p for p in self.pots[pot].bets.keys() if p.state == 3]
-		if allIns:
-			newBet = min([self.pots[pot].bets[p] for p in allIns])
-			self.handleSidePot(self.pots[pot], newBet)
-		
-		player.money -= moneyToTake
 
 	def currentBet(self):
-		return sum([x.bet for x in self.pots])
+		return self.bet
 	
 	def totalBetsPlayer(self, player: Player):
-		return sum([x.bets.get(player, 0) for x in self.pots])
+		return self.bets.get(player, 0)
 	
 	def toCall(self, player: Player):
 		return self.currentBet() - self.totalBetsPlayer(player)
-	
-	def doAction(self, player: Player):
-		print("\n")
-		print(player)
-		print(f"You are holding {str(self.playerHands[player])[1:-1]}. The community cards are {str(self.community)[1:-1]}")
-		print(f"You have currently bet £{self.totalBetsPlayer(player)}")
-		possible = self.getPossibleActions(player, self.pots[player.latestPot])
-		if "Bet" in possible:
-			print(f"There is no bet right now. You may do one of the following: {str(possible)[1:-1]}")
-		elif "Check" in possible:
-			print(f"You are at the current bet of £{self.currentBet()}. You may do one of the following: {str(possible)[1:-1]}")
-		else:
-			print(f"You current bet is £{self.currentBet()}. You may do one of the following: {str(possible)[1:-1]}")
-		
-		action = input("Select an option: ").lower()
+
+	def potTotal(self):
+		return sum(self.contributions.values())
+
+	def actionState(self, player: Player) -> dict:
+		return {
+			"player": player,
+			"name": player.name,
+			"hand": self.playerHands[player],
+			"community": self.community,
+			"money": player.money,
+			"bet": self.totalBetsPlayer(player),
+			"currentBet": self.currentBet(),
+			"toCall": self.toCall(player),
+			"pot": self.potTotal(),
+			"big": self.big,
+			"possible": self.getPossibleActions(player),
+			"strength": self.strength[player],
+		}
+
+	def doAction(self, player: Player, action: str):
 		# self.possible = ["Fold", "Check", "Call", "Bet", "Raise", "Jam"]
+		money = player.money
+		raised = self.applyAction(player, action)
+		self.emit("action", player=player, action=action.split(" ")[0], amount=money - player.money)
+		return raised
 
+	def applyAction(self, player: Player, action: str):
 		if action == "fold":
 			player.state = 0
-			for i in range(player.latestPot + 1):
-				if player in self.pots[i].bets:
-					self.pots[i].foldPlayer(player)
 			return False
 		
 		if action == "check":
@@ -268,28 +261,32 @@ class HoldEm:
 		
 		raise SyntaxError("Please enter a valid instruction.")
 
-	def betting(self):
-		# create order for betting to 1 more than current head
-		self.players.changeHead(self.players.head.next.player)
-		order = self.players.createList([1,2])
-		while order:
-			playerToAct = order.pop(0)
-			if self.doAction(playerToAct):
-				self.players.changeHead(playerToAct)
-				self.players.head = self.players.head.next
-				order = self.players.createList([2])
-			else:
-				pass
+	# betting and the streets are generators that yield (player, state) and are sent back the action
+	def betting(self, seat):
+		# seats still to act after the given seat, a raise reopens the action for everyone who now needs to call
+		# kept on the game so a snapshot taken mid street knows who is still to act
+		self.pending = self.seats.stateMask([1, 2])
+		while self.pending:
+			seat = self.seats.nextSeat(seat, self.pending)
+			self.pending &= ~(1 << seat)
+			self.toAct = seat
+			playerToAct = self.seats[seat]
+			action = yield playerToAct, self.actionState(playerToAct)
+			if self.doAction(playerToAct, action):
+				self.pending = self.seats.masks[2]
+		self.toAct = -1
 		
 		# collect all bets into pots
-		for pot in self.pots:
-			pot.newBettingRound()
+		self.bets = {}
+		self.bet = 0
+		self.handleSidePot()
+		self.emit("bettingOver", players=self.seats.createList())
 
-	def getPossibleActions(self, player: Player, pot: Pot):
+	def getPossibleActions(self, player: Player):
 		# self.possible = ["Fold", "Check", "Call", "Bet", "Raise", "Jam"]
 		if player.state == 1:
 			possible = [x for x in self.possible if x not in ["Fold", "Call", "Raise", "Bet"]]
-			if pot.bet:
+			if self.bet:
 				possible.append("Raise")
 			else:
 				possible.append("Bet")
@@ -300,7 +297,7 @@ class HoldEm:
 		return possible
 	
 	def checkIfOver(self):
-		if len(self.players.createList([1])) <= 1:
+		if self.seats.count([1]) <= 1:
 			return True
 		return False
 	
@@ -362,220 +359,236 @@ class HoldEm:
 		
 		return [-1, cards[:5]]
 
-	def bestHandKickers(self, num, hands: dict[Player: list[Card]]) -> list[Player]:
-		players = [x for x in hands]
-		i = 0
-		while i < num:
-			highestCard = -1
-			best = []
-			for player in players:
-				firstCard = hands[player][i].value
-				if firstCard > highestCard:
-					highestCard = firstCard
-					best = [player]
-				elif firstCard == highestCard:
-					best.append(player)
-			if len(best) == 1:
-				return best
-			i += 1
-			players = [x for x in best]
-		return best
-
-	def findWinners(self, players: list[Player]) -> list[Player]:
-		playerHands = {x: self.playerHands[x] for x in players}
-		playerScores = {x: None for x in players}
-		playerBestHands = {x: None for x in players}
-
-		for player in players:
-			cards = playerHands[player] + self.community
-
-			x = self.royalFlushCheck(cards)
-			if x:
-				playerScores[player] = 8
-				playerBestHands[player] = x
-				continue
-
-			x = self.straightFlushCheck(cards)
-			if x:
-				playerScores[player] = 7
-				playerBestHands[player] = x
-				continue
-
-			ans = self.multiplesCheck(cards)
-			if ans[0] == 6:
-				playerScores[player] = 6
-				playerBestHands[player] = ans[1]
-				continue
-			
-			if ans[0] == 5:
-				playerScores[player] = 5
-				playerBestHands[player] = ans[1]
-				continue
-
-			x = self.flushCheck(cards)
-			if x:
-				playerScores[player] = 4
-				playerBestHands[player] = x[:5]
-				continue
-
-			x = self.straightCheck(cards)
-			if x:
-				playerScores[player] = 3
-				playerBestHands[player] = x[:5]
-				continue
-
-			if ans[0] == 2:
-				playerScores[player] = 2
-				playerBestHands[player] = ans[1]
-				continue
-			
-			if ans[0] == 1:
-				playerScores[player] = 1
-				playerBestHands[player] = ans[1]
-				continue
+	def findWinners(self, players: list[Player], ranks: dict[Player: int]) -> list[Player]:
+		# ranks comes from the trackers once the board is out, or from a board run for the all in results
+		best = max(ranks[x] for x in players)
+		return [x for x in players if ranks[x] == best]
+
+	def deadCards(self, players: list[Player]) -> list[Card]:
+		# every hand dealt to someone else, folded or in another pot, is out of the deck for these players' runouts
+		return [x for player, hand in self.playerHands.items() if player not in players for x in hand]
+
+	def handEquities(self, players: list[Player]) -> dict[Player: float]:
+		# exact equity over every remaining runout of the current board
+		results = exactEquity([self.playerHands[x] for x in players], self.community, self.deadCards(players))
+		return {x: result.equity for x, result in zip(players, results)}
+
+	def allInResults(self, runs=2) -> dict:
+		# what everyone would get by all-in equity and by running the rest of the board several times, the hand itself is paid from one board
+		# the runs come from the undealt cards with their own seed so the deck and the real runout are left alone
+		equity = {}
+		ran = {}
+		live = [x for x in self.pots if len(x.players) > 1]
+		used = set(x.code for hand in self.playerHands.values() for x in hand) | set(x.code for x in self.community)
+		remaining = [x for x in range(52) if x not in used]
+		missing = 5 - len(self.community)
+		rng = random.Random(f"{self.handSeed}:runs")
+		if missing * runs <= len(remaining):
+			cards = rng.sample(remaining, missing * runs)
+			boards = [cards[i * missing:(i + 1) * missing] for i in range(runs)]
+		else:
+			boards = [rng.sample(remaining, missing) for _ in range(runs)]
 
-			if ans[0] == 0:
-				playerScores[player] = 0
-				playerBestHands[player] = ans[1]
+		for pot in self.pots:
+			if pot not in live:
+				equity[pot.players[0]] = equity.get(pot.players[0], 0) + pot.amount
+				ran[pot.players[0]] = ran.get(pot.players[0], 0) + pot.amount
 				continue
-			
-			playerScores[player] = -1
-			playerBestHands[player] = ans[1]
-
-		bestHand = max(playerScores.values())
-		players = [x for x in players if playerScores[x] == bestHand]
-		if len(players) == 1 or bestHand == 8:
-			return players
-		
-		return self.bestHandKickers(5, {x: playerBestHands[x] for x in players})
+			# preflop there are too many boards to enumerate every hand, so the equity is sampled
+			if self.community:
+				shares = self.handEquities(pot.players)
+			else:
+				results = monteCarlo([self.playerHands[x] for x in pot.players], dead=self.deadCards(pot.players), trials=20000, seed=f"{self.handSeed}:equity")
+				shares = {x: result.equity for x, result in zip(pot.players, results)}
+			for player, share in shares.items():
+				equity[player] = equity.get(player, 0) + pot.amount * share
+			for board in boards:
+				bits, key = handState(board)
+				ranks = {x: rankState(self.strength[x].bits | bits, self.strength[x].key * key) for x in pot.players}
+				winners = self.findWinners(pot.players, ranks)
+				for player in winners:
+					ran[player] = ran.get(player, 0) + pot.amount / runs / len(winners)
+		return {"equity": equity, "runs": ran}
 
 	def end(self):
 		self.ended = True
-		self.players.head = self.button
+		self.handleSidePot()
+		contested = [x for x in self.pots if len(x.players) > 1]
+
+		if contested and len(self.community) != 5:
+			if self.reportAllIn:
+				self.emit("allIn", community=list(self.community), **self.allInResults())
+			self.dealCommunity(5 - len(self.community), "Runout")
+		# every player still in is scored once and the ranks are shared by all the pots they are in
+		ranks = {x: self.strength[x].rank for pot in contested for x in pot.players}
 
 		for pot in self.pots:
-			playersIn = list(pot.bets.keys())
-			if len(playersIn) == 1:
-				total = pot.lastTotal + sum(pot.bets.values())
-				playersIn[0].money += total
-				print(f"{playersIn[0].name} wins £{total}")
+			if len(pot.players) == 1:
+				pot.players[0].money += pot.amount
+				self.emit("win", player=pot.players[0], amount=pot.amount)
 				continue
 
-			if len(self.community) != 5:
-				self.community += self.deck.deal(5 - len(self.community))
-				print(f"Community cards are now {str(self.community)[1:-1]}")
-			
-			winners = self.findWinners(playersIn)
-			print(winners)
-			win = (pot.lastTotal + sum(pot.bets.values())) // len(winners)
+			winners = self.findWinners(pot.players, ranks)
+			self.emit("showdown", players=pot.players, winners=winners, hands={x: self.playerHands[x] for x in pot.players})
+			win = pot.amount // len(winners)
 			for player in winners:
 				player.money += win
+				self.emit("win", player=player, amount=win)
 			
-			left = (pot.lastTotal + sum(pot.bets.values())) - (win * len(winners))
+			left = pot.amount - (win * len(winners))
 			if left:
-				playerOrder = self.players.createList()
+				# the odd chip goes to the first winner left of the button, before the seat ring it went to the first winner from the button itself
+				playerOrder = self.seats.createList(start=self.seats.button + 1)
 				for player in playerOrder:
 					if player in winners:
 						player.money += left
+						self.emit("win", player=player, amount=left)
 						break
 
-	def newRound(self):
+	def dealCommunity(self, number, street):
+		cards = self.deck.deal(number)
+		self.community += cards
+		for player in self.seats.createList([1, 2, 3]):
+			self.strength[player].add(cards)
+		self.emit("board", street=street, community=self.community)
+
+	def canPlay(self):
+		return len([x for x in self.seats.createList() if x.money > 0 and not x.sittingOut]) > 1
+
+	def newRound(self, seed=None):
 		self.ended = False
-		fullList = self.players.createList()
-		print(fullList)
-		for p in fullList:
-			p.latestPot = 0
-			if p.money == 0:
+		for p in self.seats.createList():
+			if p.money == 0 or p.sittingOut:
 				p.state = 0
 			else:
 				p.state = 2
-		fullList = self.players.createList([2])
-
-		self.pots = [Pot()]
-		self.deck.shuffle()
-
-		# post blinds
-		offset = 0
-		if len(fullList) == 2:
-			offset = 1
-		small = fullList[1 - offset]
-		big = fullList[2 - offset]
-		self.handleBet(small, self.small)
-		self.handleBet(big, self.big)
-		print(f"Dealer: {self.button.player}, SB: {small}, BB: {big}")
+		dealt = self.seats.masks[2]
+		if not dealt >> self.seats.button & 1:
+			self.seats.button = self.seats.nextSeat(self.seats.button, dealt)
+		button = self.seats.button
+
+		self.pots = []
+		self.pending = 0
+		self.toAct = -1
+		self.contributions = {}
+		self.bets = {}
+		self.bet = 0
+		if seed is None:
+			seed = self.rng.getrandbits(32)
+		elif not isinstance(seed, int) or not 0 <= seed < 1 << 32:
+			# hand seeds are logged in 32 bits, any other seed is turned into one so the hand can still be replayed from the log
+			seed = random.Random(seed).getrandbits(32)
+		self.handSeed = seed
+		self.deck.shuffle(self.handSeed)
+
+		# post blinds, heads up the button is the small blind
+		small = button if dealt.bit_count() == 2 else self.seats.nextSeat(button, dealt)
+		big = self.seats.nextSeat(small, dealt)
+		self.emit("newRound", players=self.seats.createList(), button=self.seats[button], small=self.seats[small], big=self.seats[big], seed=self.handSeed)
+		self.handleBet(self.seats[small], self.small)
+		self.handleBet(self.seats[big], self.big)
+		self.emit("blind", player=self.seats[small], amount=self.small)
+		self.emit("blind", player=self.seats[big], amount=self.big)
 
 		# deal cards
-		self.playerHands = {x: [] for x in fullList}
+		dealList = self.seats.createList([1, 2, 3], small)
+		self.playerHands = {x: [] for x in dealList}
 		self.community = []
-
-		self.players.changeHead(fullList[1])
-		dealList = self.players.createList([1, 2])
 		for _ in range(2):
 			for p in dealList:
 				self.playerHands[p] += self.deck.deal()
+		self.strength = {x: HandTracker(self.playerHands[x]) for x in dealList}
+		self.emit("holeCards", hands=self.playerHands)
 		
 		# set up action for preflop
-		self.players.changeHead(big)
-		self.betting()
-		print(self.players.createList())
-		print(self.playerHands)
+		yield from self.betting(big)
 
 		if self.checkIfOver():
 			self.end()
 
 	def flop(self):
 		# deal cards
-		self.community = self.deck.deal(3)
-
-		self.players.head = self.button
+		self.dealCommunity(3, "Flop")
 
 		# set up action for betting
-		self.betting()
-		print(self.players.createList())
+		yield from self.betting(self.seats.button)
 
 		if self.checkIfOver():
 			self.end()
 	
 	def turn(self):
 		# deal cards
-		self.community += self.deck.deal()
-
-		self.players.head = self.button
+		self.dealCommunity(1, "Turn")
 
 		# set up action for betting
-		self.betting()
-		print(self.players.createList())
+		yield from self.betting(self.seats.button)
 
 		if self.checkIfOver():
 			self.end()
 	
 	def river(self):
 		# deal cards
-		self.community += self.deck.deal()
-
-		self.players.head = self.button
+		self.dealCommunity(1, "River")
 
 		# set up action for betting
-		self.betting()
-		print(self.players.createList())
+		yield from self.betting(self.seats.button)
+
+	def handSteps(self, seed=None):
+		yield from self.newRound(seed)
+		if not self.ended:
+			yield from self.flop()
+		if not self.ended:
+			yield from self.turn()
+		if not self.ended:
+			yield from self.river()
+		if not self.ended:
+			self.end()
+		self.emit("handOver", players=self.seats.createList())
+		self.seats.moveButton()
+
+	def playHand(self, seed=None):
+		steps = self.handSteps(seed)
+		action = None
+		while True:
+			try:
+				player, state = steps.send(action)
+			except StopIteration:
+				return
+			action = self.agents.get(player.name, consoleAgent)(state)
+
+	def run(self, hands):
+		# play hands without stopping until only one player has money left
+		played = 0
+		while played < hands and self.canPlay():
+			self.playHand()
+			played += 1
+		return played
 	
 	def main(self):
 		while True:
-			print(self.players.createList())
+			print(self.seats.createList())
 			x = input("Press enter to continue. ")
 			if x != "":
 				break
-			self.newRound()
-			if not self.ended:
-				self.flop()
-			if not self.ended:
-				self.turn()
-			if not self.ended:
-				self.river()
-			if not self.ended:
-				self.end()
-			self.players.changeHead(self.button.next.player)
+			self.playHand()
+
+def consoleListener(event, data):
+	if event == "newRound":
+		print(data["players"])
+		print(f"Dealer: {data['button']}, SB: {data['small']}, BB: {data['big']}")
+	elif event == "holeCards":
+		print(data["hands"])
+	elif event == "action":
+		print(f"{data['player'].name}: {data['action']} £{data['amount']}")
+	elif event == "bettingOver":
+		print(data["players"])
+	elif event == "board":
+		print(f"Community cards are now {str(data['community'])[1:-1]}")
+	elif event == "showdown":
+		print(data["winners"])
+	elif event == "win":
+		print(f"{data['player'].name} wins £{data['amount']}")
 
 if __name__ == "__main__":
-	game = HoldEm(1, 2, 50, ["Toby", "Lucy", "Tanheed", "Josh", "Liam", "Tom", "Harvey"])
+	game = HoldEm(1, 2, 50, ["Toby", "Lucy", "Tanheed", "Josh", "Liam", "Tom", "Harvey"], listeners=[consoleListener])
 	game.main()
@@ -0,0 +1,65 @@
+import itertools
+import numpy as np
+from evaluator import FLUSHES, PRIMES, UNSUITED
+
+# value keys whose sums are different for every multiset of 5, 6 or 7 values, so the sum can index a flat table
+RANK_KEYS = [0, 1, 5, 22, 98, 453, 2031, 8698, 22854, 83661, 262349, 636345, 1479181]
+CARD_KEYS = np.array([RANK_KEYS[x >> 2] for x in range(52)], dtype=np.int32)
+# each suit counts in its own octal digit, the sum of a hand finds the suit that has 5 or more
+CARD_SUITS = np.array([8 ** (x & 3) for x in range(52)], dtype=np.int32)
+CARD_BITS = np.array([1 << ((x & 3) * 16 + (x >> 2)) for x in range(52)], dtype=np.int64)
+FLUSH_SUIT = np.array([max(range(4), key=lambda s: x >> 3 * s & 7) for x in range(8 ** 4)], dtype=np.int64) * 16
+FLUSH_TABLE = np.array(FLUSHES, dtype=np.int32)
+CHUNK = 1 << 16
+
+unsuitedTables = {}
+
+def unsuitedTable(number) -> np.ndarray:
+	# built from the scalar evaluator's table the first time hands of this size are ranked
+	if number not in unsuitedTables:
+		keys = []
+		ranks = []
+		for values in itertools.combinations_with_replacement(range(13), number):
+			if max(values.count(x) for x in set(values)) > 4:
+				continue
+			product = 1
+			for x in values:
+				product *= PRIMES[x]
+			keys.append(sum(RANK_KEYS[x] for x in values))
+			ranks.append(UNSUITED[product])
+		table = np.zeros(max(keys) + 1, dtype=np.int32)
+		table[keys] = ranks
+		unsuitedTables[number] = table
+	return unsuitedTables[number]
+
+def rankChunk(columns, table) -> np.ndarray:
+	# columns is the chunk transposed so each card position is contiguous, the loop is over the 5-7 positions
+	bits = CARD_BITS[columns[0]]
+	suits = CARD_SUITS[columns[0]]
+	keys = CARD_KEYS[columns[0]]
+	for column in columns[1:]:
+		bits |= CARD_BITS[column]
+		suits += CARD_SUITS[column]
+		keys += CARD_KEYS[column]
+
+	# only the suit with the most cards can hold a flush, its 13 bits pick the flush rank or 0
+	# a flush always beats the unsuited rank of the same cards so the larger of the two is the hand
+	return np.maximum(FLUSH_TABLE[(bits >> FLUSH_SUIT[suits]) & 0x1FFF], table[keys])
+
+def rankBatch(codes) -> np.ndarray:
+	# codes is an (N, 5-7) array of card codes, returns the (N,) ranks the scalar evaluator would give
+	codes = np.asarray(codes)
+	if codes.dtype.kind not in "iu":
+		codes = codes.astype(np.int32)
+	if codes.ndim != 2 or not 5 <= codes.shape[1] <= 7:
+		raise ValueError("Hands must be an (N, 5), (N, 6) or (N, 7) array of card codes")
+	table = unsuitedTable(codes.shape[1])
+	ranks = np.empty(len(codes), dtype=np.int32)
+	for start in range(0, len(codes), CHUNK):
+		ranks[start:start + CHUNK] = rankChunk(np.ascontiguousarray(codes[start:start + CHUNK].T), table)
+	return ranks
+
+def randomHands(number, cards=7, seed=None) -> np.ndarray:
+	# distinct cards in every row, for tests and benchmarks
+	rng = np.random.default_rng(seed)
+	return np.argsort(rng.random((number, 52)), axis=1)[:, :cards].astype(np.uint8)